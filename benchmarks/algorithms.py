@@ -0,0 +1,74 @@
+import math
+import numpy as np
+from cachingalgo.full_observation.single_cache import LFU, BucketLFU, WLFU, BucketWLFU, LFULite, ArrayLFULite, \
+    CountSketch, HashCountSketch, LRU, OrderedLRU, LU, KineticLU
+from cachingalgo.full_observation.multiple_cache import LRUm, OrderedLRUm, fLRU, OrderedfLRU
+from cachingalgo.full_observation.cost_min import CMSR, NewtonCMSR, CMDR, SeparableCMDR, \
+    IncrementalCMDR
+from cachingalgo.partial_observation.single_cache import CBMPS, ArrayCBMPS, CBSI, ArrayCBSI, CBSILite, \
+    ArrayCBSILite, calculate_delta
+from cachingalgo.tandem_model.dynamic import LU2, KineticLU2
+
+# Window of WLFU is C^2 log(L), capped so that the largest caches can be initialised
+MAX_WINDOW = 1_000_000
+# Freshness constraint of the items for the LU algorithms
+FRESHNESS = 100
+# Parameters of the cost minimisation
+COST = dict(beta=10, z=1.5, lambda_param=5, Cost=[1, 0.1, 0.05, 0.025])
+
+def window(L, C):
+    return min(int(C*C*math.log(L)), MAX_WINDOW)
+
+def freshness(L):
+    return np.full((L,), FRESHNESS, dtype=int)
+
+def bandit(cls, L, C, prob, **kwargs):
+    delta, mu_c = calculate_delta(prob, cache_size=C)
+    return cls(L=L, cache_size=C, mu_c=mu_c, delta=delta, **kwargs)
+
+
+# Benchmarked algorithms, name -> (package, factory(L, C, prob, seed))
+ALGORITHMS = {
+    'LFU': ('full_observation', lambda L, C, prob, seed: LFU(L=L, cache_size=C)),
+    'BucketLFU': ('full_observation', lambda L, C, prob, seed: BucketLFU(L=L, cache_size=C)),
+    'WLFU': ('full_observation', lambda L, C, prob, seed: WLFU(L=L, cache_size=C, window=window(L, C))),
+    'BucketWLFU': ('full_observation', lambda L, C, prob, seed: BucketWLFU(L=L, cache_size=C, window=window(L, C))),
+    'LFULite': ('full_observation', lambda L, C, prob, seed: LFULite(L=L, cache_size=C, window=window(L, C))),
+    'ArrayLFULite': ('full_observation', lambda L, C, prob, seed: ArrayLFULite(L=L, cache_size=C, window=window(L, C))),
+    'CountSketch': ('full_observation', lambda L, C, prob, seed: CountSketch(l=6, b=C, L=L)),
+    'HashCountSketch': ('full_observation', lambda L, C, prob, seed: HashCountSketch(l=6, b=C, L=L, seed=seed)),
+    'LRU': ('full_observation', lambda L, C, prob, seed: LRU(cache_size=C, L=L)),
+    'OrderedLRU': ('full_observation', lambda L, C, prob, seed: OrderedLRU(cache_size=C, L=L)),
+    'LRUm': ('full_observation', lambda L, C, prob, seed: LRUm(size=max(C//2, 1), f=3, v=1, L=L)),
+    'OrderedLRUm': ('full_observation', lambda L, C, prob, seed: OrderedLRUm(size=max(C//2, 1), f=3, v=1, L=L)),
+    'fLRU': ('full_observation', lambda L, C, prob, seed: fLRU(f=2, size=C, L=L)),
+    'OrderedfLRU': ('full_observation', lambda L, C, prob, seed: OrderedfLRU(f=2, size=C, L=L)),
+    'LU': ('full_observation', lambda L, C, prob, seed: LU(L=L, F=freshness(L), cache_size=C, arr=prob)),
+    'KineticLU': ('full_observation', lambda L, C, prob, seed: KineticLU(L=L, F=freshness(L), cache_size=C, arr=prob)),
+    'LU-LFU': ('full_observation', lambda L, C, prob, seed: LU(L=L, F=freshness(L), cache_size=C, method='lfu')),
+    'KineticLU-LFU': ('full_observation', lambda L, C, prob, seed: KineticLU(L=L, F=freshness(L), cache_size=C, method='lfu')),
+    'LU-LFULite': ('full_observation', lambda L, C, prob, seed: LU(L=L, F=freshness(L), cache_size=C, method='lfulite',
+                                                                 window=window(L, C), freqtop=C)),
+    'CMSR': ('cost_min', lambda L, C, prob, seed: CMSR(cache_size=C, L=L, prob=prob, **COST)),
+    'NewtonCMSR': ('cost_min', lambda L, C, prob, seed: NewtonCMSR(cache_size=C, L=L, prob=prob, **COST)),
+    'CMDRM': ('cost_min', lambda L, C, prob, seed: CMDR(cache_size=C, L=L, cache_update='marg', seed=seed, **COST)),
+    'CMDRP': ('cost_min', lambda L, C, prob, seed: CMDR(cache_size=C, L=L, cache_update='pop', seed=seed, **COST)),
+    'SeparableCMDRM': ('cost_min', lambda L, C, prob, seed: SeparableCMDR(cache_size=C, L=L, cache_update='marg',
+                                                                          seed=seed, **COST)),
+    'SeparableCMDRP': ('cost_min', lambda L, C, prob, seed: SeparableCMDR(cache_size=C, L=L, cache_update='pop',
+                                                                          seed=seed, **COST)),
+    'IncrementalCMDRM': ('cost_min', lambda L, C, prob, seed: IncrementalCMDR(cache_size=C, L=L, cache_update='marg',
+                                                                              seed=seed, **COST)),
+    'IncrementalCMDRP': ('cost_min', lambda L, C, prob, seed: IncrementalCMDR(cache_size=C, L=L, cache_update='pop',
+                                                                              seed=seed, **COST)),
+    'CBMPS': ('partial_observation', lambda L, C, prob, seed: CBMPS(L=L, cache_size=C)),
+    'ArrayCBMPS': ('partial_observation', lambda L, C, prob, seed: ArrayCBMPS(L=L, cache_size=C, seed=seed)),
+    'CBSI': ('partial_observation', lambda L, C, prob, seed: bandit(CBSI, L, C, prob)),
+    'ArrayCBSI': ('partial_observation', lambda L, C, prob, seed: bandit(ArrayCBSI, L, C, prob, seed=seed)),
+    'CBSILite': ('partial_observation', lambda L, C, prob, seed: bandit(CBSILite, L, C, prob, win=window(L, C))),
+    'ArrayCBSILite': ('partial_observation', lambda L, C, prob, seed: bandit(ArrayCBSILite, L, C, prob, seed=seed,
+                                                                          win=window(L, C))),
+    'LU2': ('tandem_model', lambda L, C, prob, seed: LU2(cache_sizes=[max(C//2, 1)]*2, L=L, F=freshness(L), arr=prob)),
+    'KineticLU2': ('tandem_model', lambda L, C, prob, seed: KineticLU2(cache_sizes=[max(C//2, 1)]*2, L=L,
+                                                                      F=freshness(L), arr=prob)),
+}
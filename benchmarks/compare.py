@@ -0,0 +1,79 @@
+"""
+Prints the scaling curves of a benchmark result, or compares two results to find regressions.
+
+python -m benchmarks.compare results.json
+python -m benchmarks.compare old.json new.json --threshold 0.1
+"""
+import argparse
+import json
+import sys
+
+def load(path):
+    """
+    Returns the results of a benchmark json file keyed by (algorithm, L, C)
+    """
+    with open(path) as f:
+        data = json.load(f)
+    return data['meta'], {(r['algorithm'], r['L'], r['C']): r for r in data['results']}
+
+
+def curves(results, metric='requests_per_second'):
+    """
+    Prints the metric of every algorithm against C for each L
+    """
+    sizes = sorted({(L, C) for _, L, C in results})
+    for L in sorted({L for L, _ in sizes}):
+        cs = [C for l, C in sizes if l == L]
+        print(f"\nL = {L}, {metric}")
+        print(f"{'algorithm':>15}" + ''.join(f"{'C=' + str(C):>14}" for C in cs))
+        for name in dict.fromkeys(a for a, _, _ in results):
+            values = [results.get((name, L, C), {}).get(metric) for C in cs]
+            print(f"{name:>15}" + ''.join(f"{v:>14.1f}" if v is not None else f"{'-':>14}" for v in values))
+
+
+def compare(old, new, threshold):
+    """
+    Prints the ratio of the throughput and p99 latency of the new results to the old results
+    threshold: relative drop of the throughput reported as a regression
+    Returns the list of regressed keys
+    """
+    regressions = []
+    print(f"{'algorithm':>15} {'L':>7} {'C':>6} {'old req/s':>12} {'new req/s':>12} {'ratio':>7} {'p99 ratio':>9}")
+    for key in new:
+        if key not in old or 'error' in old[key] or 'error' in new[key]:
+            continue
+        o, n = old[key], new[key]
+        ratio = n['requests_per_second']/o['requests_per_second']
+        p99 = n['p99_us']/o['p99_us'] if o['p99_us'] > 0 else float('nan')
+        flag = ''
+        if ratio < 1 - threshold:
+            regressions.append(key)
+            flag = ' regression'
+        print(f"{key[0]:>15} {key[1]:>7} {key[2]:>6} {o['requests_per_second']:>12.1f} "
+              f"{n['requests_per_second']:>12.1f} {ratio:>7.2f} {p99:>9.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compares the benchmark results")
+    parser.add_argument('results', nargs='+', help="One result to print the curves or the old and new results")
+    parser.add_argument('--metric', default='requests_per_second',
+                        help="requests_per_second, p50_us, p99_us, peak_memory_mb or setup_seconds")
+    parser.add_argument('--threshold', type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    if len(args.results) == 1:
+        _, results = load(args.results[0])
+        curves(results, args.metric)
+        return 0
+
+    oldmeta, old = load(args.results[0])
+    newmeta, new = load(args.results[1])
+    print(f"old: {oldmeta['commit']}  new: {newmeta['commit']}")
+    regressions = compare(old, new, args.threshold)
+    print(f"\n{len(regressions)} regressions")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
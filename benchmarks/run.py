@@ -0,0 +1,155 @@
+"""
+Benchmarks the caching algorithms on requests sampled from the Netflix (L = 17,770) and
+YouTube (L = 1,61,085) popularity profiles, other library sizes use Zipf with a = 1.
+
+For each algorithm, library size L and cache size C it reports the setup time, requests per
+second, p50/p99 latency of a request and the peak memory, and saves them with the commit and
+the versions in a json file which can be compared with benchmarks/compare.py.
+
+python -m benchmarks.run --C 10 100 1000 10000 --output results.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import numpy as np
+from cachingalgo.request_generation.continuous import PopularitySampler, StaticZipf, load_profile
+from cachingalgo.simulate import adapt
+from benchmarks.algorithms import ALGORITHMS
+
+# Library sizes of the popularity profiles
+PROFILES = {17_770: 'netflix', 1_61_085: 'youtube'}
+
+def popularity(L):
+    """
+    Returns the popularity profile of library size L
+    """
+    if L in PROFILES:
+        return np.asarray(load_profile(PROFILES[L])[1])
+    return StaticZipf(L=L, a=1).prob
+
+
+def replay(policy, requests, budget):
+    """
+    Serves the requests until all of them are served or the time budget is over
+    policy: Policy of the algorithm
+    requests: list of requests
+    budget: time budget in seconds
+    Returns the latencies of the served requests in nanoseconds, the total time and the no. of hits
+    """
+    latency = np.zeros((len(requests),), dtype=np.int64)
+    clock = time.perf_counter_ns
+    deadline = clock() + int(budget*1e9)
+    hits = 0
+    start = clock()
+    for i, req in enumerate(requests):
+        t = clock()
+        hit = policy.access(req, i)
+        end = clock()
+        latency[i] = end - t
+        hits += bool(hit)
+        if end > deadline:
+            latency = latency[:i+1]
+            break
+    return latency, (clock() - start)/1e9, hits
+
+
+def bench(name, L, C, prob, requests, budget, memory, seed):
+    """
+    Benchmarks the algorithm
+    name: Name of the algorithm in ALGORITHMS
+    L: Library size
+    C: Cache size
+    prob: Popularity profile
+    requests: list of requests
+    budget: time budget of the replay in seconds
+    memory: whether to measure the peak memory
+    seed: seed of the algorithm
+    Returns the row of the results
+    """
+    package, factory = ALGORITHMS[name]
+    row = {'algorithm': name, 'package': package, 'L': L, 'C': C}
+
+    try:
+        np.random.seed(seed)
+        start = time.perf_counter()
+        policy = adapt(factory(L, C, prob, seed))
+        row['setup_seconds'] = time.perf_counter() - start
+
+        latency, elapsed, hits = replay(policy, requests, budget)
+        row['requests'] = len(latency)
+        row['hit_rate'] = hits/len(latency)
+        row['seconds'] = elapsed
+        row['requests_per_second'] = len(latency)/elapsed
+        row['p50_us'] = float(np.percentile(latency, 50))/1e3
+        row['p99_us'] = float(np.percentile(latency, 99))/1e3
+
+        # Peak memory of the setup and the same requests, traced separately as tracing slows the replay
+        if memory:
+            np.random.seed(seed)
+            tracemalloc.start()
+            try:
+                policy = adapt(factory(L, C, prob, seed))
+                replay(policy, requests[:len(latency)], budget)
+                row['peak_memory_mb'] = tracemalloc.get_traced_memory()[1]/2**20
+            finally:
+                tracemalloc.stop()
+    except Exception as e:
+        row['error'] = f"{type(e).__name__}: {e}"
+
+    return row
+
+
+def metadata():
+    """
+    Returns the commit, versions and machine of the benchmark
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'commit': commit, 'time': datetime.now(timezone.utc).isoformat(), 'python': platform.python_version(),
+            'numpy': np.__version__, 'machine': platform.machine(), 'processor': platform.processor(),
+            'system': platform.platform()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks the caching algorithms")
+    parser.add_argument('--algorithms', nargs='+', default=list(ALGORITHMS), choices=list(ALGORITHMS))
+    parser.add_argument('--packages', nargs='+', default=None,
+                        help="full_observation, partial_observation, tandem_model or cost_min")
+    parser.add_argument('--L', nargs='+', type=int, default=[17_770, 1_61_085], help="Library sizes")
+    parser.add_argument('--C', nargs='+', type=int, default=[10, 100, 1000, 10000], help="Cache sizes")
+    parser.add_argument('--requests', type=int, default=20_000, help="No. of requests of each run")
+    parser.add_argument('--budget', type=float, default=10, help="Time budget of each run in seconds")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help="Skip measuring the peak memory")
+    parser.add_argument('--output', default='benchmark.json')
+    args = parser.parse_args(argv)
+
+    names = [n for n in args.algorithms if args.packages is None or ALGORITHMS[n][0] in args.packages]
+    results = []
+    for L in args.L:
+        prob = popularity(L)
+        requests = PopularitySampler(prob, seed=args.seed).sample(args.requests).tolist()
+        for C in args.C:
+            if C >= L:
+                continue
+            for name in names:
+                row = bench(name, L, C, prob, requests, args.budget, not args.no_memory, args.seed)
+                results.append(row)
+                if 'error' in row:
+                    print(f"{name:>15} L={L:<7} C={C:<6} {row['error']}", flush=True)
+                else:
+                    print(f"{name:>15} L={L:<7} C={C:<6} {row['requests_per_second']:>12.1f} req/s "
+                          f"p50 {row['p50_us']:>10.1f} us p99 {row['p99_us']:>10.1f} us", flush=True)
+
+    with open(args.output, 'w') as f:
+        json.dump({'meta': metadata(), 'args': vars(args), 'results': results}, f, indent=1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 from scipy.optimize import minimize_scalar, minimize
 import numpy as np
 import random
+from cachingalgo.structures import IndexedHeap, TopK
 
 # Cost Minimisation with Same Refresh Rate
 class CMSR:
@@ -96,6 +97,195 @@ class CMSR:
         self.refreshrate_cache()
         return self.C_hat
 
+# CMSR with the refresh rate found from the analytic derivative of the average system cost.
+# The terms of the cost depending on the items are precomputed, the derivative
+#     |C| C_ch + C_ca sum(lambda^2/(lambda+rr)^2) - beta C_o sum(p lambda)/rr^2
+# is solved with Newton's method safeguarded by bisection, and the cache iteration stops when the
+# cache repeats itself, choosing the cache of least cost if the iteration cycles.
+class NewtonCMSR(CMSR):
+    def __init__(self, cache_size, beta, z, lambda_param, L, Cost, prob=[], mu_hat=[], C_hat=[], tol=1e-12, maxiter=100):
+        """
+        Cost : [C_f, C_ca, C_ch, C_o] = [fetching, additional caching, checking, constant]
+        beta : Arrival Rate
+        cache_size : Size of the Cache
+        lambda_param : lambda parameter
+        z: order of the lambda_ (Refresh rates of the library gets decreased)
+        prob: Popularity profile of the contents in the library
+        mu_hat: initial refresh rate, the search for the optimal refresh rate starts from it
+        C_hat: initial cache, Default is the cache_size most popular items
+        tol: relative tolerance of the refresh rate
+        maxiter: Max. no. of iterations of the solver and of the cache updates
+        """
+        self.L = L
+        self.cost = Cost
+        self.cache_size = cache_size
+        self.beta = beta
+        self.lambda_param = lambda_param
+        self.tol = tol
+        self.maxiter = maxiter
+        self.lambda_ = self.lambda_param/np.arange(1, self.L+1, dtype=np.float64)**z # Refresh rates of the contents
+        self.lambda2 = self.lambda_**2
+        self.update_popularity(prob, solve=False)
+        C_hat = np.asarray(C_hat, dtype=int)
+        self.C_old = C_hat if C_hat.shape[0] > 0 else self.top(self.prob) # Old cache
+        if np.isscalar(mu_hat) and mu_hat > 0:
+            self.mu_hat = float(mu_hat)                          # Starting point of minimize_cost
+        self.mu_hat = self.minimize_cost(self.C_old)             # Checking Rate of the cache
+        self.C_hat = self.C_old
+        self.cache_update()                                      # Calculated cache
+
+    def update_popularity(self, prob, solve=True):
+        """
+        Changes the popularity profile and the terms of the cost depending on it
+        prob: Popularity profile of the contents in the library
+        solve: True - calculates the cache and the refresh rate again
+        """
+        self.prob = np.asarray(prob, dtype=np.float64)
+        self.plambda = self.beta*self.cost[3]*self.prob*self.lambda_
+        if solve:
+            self.refreshrate_cache()
+
+    def top(self, values):
+        """
+        Returns the cache_size items of the largest values in decreasing order
+        """
+        n = min(self.cache_size, values.shape[0])
+        if n == 0:
+            return np.array([], dtype=int)
+        top = np.argpartition(values, values.shape[0]-n)[values.shape[0]-n:]
+        return top[np.argsort(values[top], kind='stable')[::-1]]
+
+    def cost_of(self, rr, d):
+        """
+        Calculates the average system cost of the cache d with refresh rate rr
+        """
+        eps = 1e-15
+        lam = self.lambda_[d]
+        return self.beta*self.cost[0] + \
+                    len(d)*rr*self.cost[2] + \
+                    rr*self.cost[1]*np.sum(lam/(lam + rr)) + \
+                    np.sum(self.plambda[d])/(rr+eps) - self.beta*self.cost[0]*np.sum(self.prob[d])
+
+    def avg_sys_cost(self, rr):
+        """
+        Calculates the average system cost of the current cache
+        rr: Refresh rate of the cache
+        Returns the average system cost
+        """
+        return self.cost_of(rr, self.C_hat)
+
+    def minimize_cost(self, d=None):
+        """
+        Minimises the average system cost of the cache d, Default is the current cache
+        Returns the optimal refresh rate of the cache
+        """
+        eps = 1e-15
+        if d is None:
+            d = self.C_hat
+        if len(d) == 0:
+            return 0.0
+
+        lam = self.lambda_[d]
+        lam2 = self.lambda2[d]
+        a = np.sum(self.plambda[d])
+        c = len(d)*self.cost[2]
+
+        def slope(rr):
+            return c + self.cost[1]*np.sum(lam2/(lam+rr)**2) - a/(rr+eps)**2
+
+        def curvature(rr):
+            return -2*self.cost[1]*np.sum(lam2/(lam+rr)**3) + 2*a/(rr+eps)**3
+
+        # The cost only increases with the refresh rate when no cached item is requested
+        if a <= 0:
+            return 0.0
+
+        # Bracketing the minimum starting from the last refresh rate,
+        # the slope is negative near 0 and becomes positive
+        rr = getattr(self, 'mu_hat', 0)
+        rr = rr if np.isscalar(rr) and rr > 0 else 1.0
+        lo, hi = 0.0, rr
+        while slope(hi) < 0:
+            lo, hi = hi, 2*hi
+            if hi > 1e300:
+                return hi
+        if lo == 0:
+            lo = hi/2
+            while lo > 1e-300 and slope(lo) >= 0:
+                hi, lo = lo, lo/2
+        rr = hi
+        for _ in range(self.maxiter):
+            g = slope(rr)
+            if g < 0:
+                lo = rr
+            else:
+                hi = rr
+            h = curvature(rr)
+            step = g/h if h > 0 else np.inf
+            new = rr - step
+            # Bisection whenever the Newton step leaves the bracket
+            if not (lo < new < hi):
+                new = (lo + hi)/2
+            if abs(new - rr) <= self.tol*max(rr, 1e-300):
+                rr = new
+                break
+            rr = new
+        return rr
+
+    def marg_cost(self, mu_hat=None):
+        """
+        Calculates the marginal cost vector of the items in the library
+        Returns the marginal cost vector
+        """
+        eps = 1e-15
+        if mu_hat is None:
+            mu_hat = self.mu_hat
+        return mu_hat*self.cost[2] + \
+            ((mu_hat*self.lambda_)/(self.lambda_ + mu_hat))*self.cost[1] + \
+            self.plambda/(mu_hat+eps) - self.beta*self.cost[0]*self.prob
+
+    def find_cache(self, mu_hat):
+        """
+        Returns the cache_size items of the most negative marginal cost
+        """
+        mc = self.marg_cost(mu_hat)
+        neg = np.flatnonzero(mc < 0)
+        return neg[self.top(-mc[neg])]
+
+    def cache_update(self):
+        """
+        Updates the Cache according to the marginal cost
+        """
+        self.C_hat = self.find_cache(self.mu_hat)
+
+    def refreshrate_cache(self):
+        """
+        Calculates the optimal refresh rate of the cache and optimal cache after their convergence
+        """
+        d = self.C_hat
+        visited = {} # cache -> position in history
+        history = [] # (cache, refresh rate, cost)
+        for _ in range(self.maxiter):
+            key = frozenset(d.tolist())
+            if key in visited:
+                # Cycle, the cache of least cost in the cycle is chosen
+                d, mu, _ = min(history[visited[key]:], key=lambda x: x[2])
+                break
+            mu = self.minimize_cost(d)
+            visited[key] = len(history)
+            history.append((d, mu, self.cost_of(mu, d)))
+            new = self.find_cache(mu)
+            if frozenset(new.tolist()) == key:
+                d = new
+                break
+            d = new
+        else:
+            mu = self.minimize_cost(d)
+        self.C_old = self.C_hat
+        self.C_hat = d
+        self.mu_hat = mu
+
+
 # Cost Minimization with Different Refresh Rates
 # Variants of CMDR- CMDR: Popularity is given
 #                   CMDRP: Popularity is not given and cache update according to popularity
@@ -218,6 +408,13 @@ class CMDR:
         """
         self.arr[req] += 1
 
+    def counter_update_many(self, reqs):
+        """
+        Increases the counters with a batch of requests, same as calling counter_update for each request
+        reqs: array of requests
+        """
+        self.arr += np.bincount(np.asarray(reqs, dtype=np.int64), minlength=self.L)
+
     # Calculates the popularity distribution
     def currcache(self, req):
         """
@@ -228,3 +425,252 @@ class CMDR:
             self.prob = self.arr/np.sum(self.arr)
             self.cache_update(req)
         return self.C_hat
+
+# CMDR with the refresh rates of the cached items solved separately. The average system cost is
+# a sum of the costs of the cached items
+#     rr C_ch + C_ca rr lambda/(lambda+rr) + beta p (lambda C_o/rr - C_f)
+# so the refresh rate of every item is the root of it's derivative in [0, lambda]. The root lies in
+# [sqrt(beta C_o p lambda/(C_ch+C_ca)), sqrt(beta C_o p lambda/C_ch)], and all the roots are found
+# together with Newton's method safeguarded by bisection. Only the items whose popularity changed
+# by more than rtol (relative) since they were solved are solved again. When the popularity is
+# calculated from the counters every popularity changes with the total on every request, so an
+# item which isn't requested is solved again only after the total grows by a factor of 1+rtol.
+class SeparableCMDR(CMDR):
+    def __init__(self, cache_size, beta, z, lambda_param, L, Cost, cache_update = 'marg', seed = 7, prob = [], C_hat=[], tol=1e-12, maxiter=100, rtol=1e-3):
+        """
+        Refer to CMDR to understand variables
+        tol: relative tolerance of the refresh rates
+        maxiter: Max. no. of iterations of the solver
+        rtol: relative change of the popularity of an item after which it's refresh rate is solved again,
+              0 solves it again whenever the popularity changes
+        """
+        self.tol = tol
+        self.rtol = rtol
+        self.maxiter = maxiter
+        self.L = L
+        self.solved = np.full((L,), np.nan) # popularity of the items when their refresh rates were solved
+        super().__init__(cache_size=cache_size, beta=beta, z=z, lambda_param=lambda_param, L=L, Cost=Cost,
+                         cache_update=cache_update, seed=seed, prob=prob, C_hat=C_hat)
+        self.C_hat = np.asarray(self.C_hat, dtype=int)
+        self.lambda2 = self.lambda_**2
+        if not self.calpop:
+            self.mu_hat[self.C_hat] = self.minimize_cost()
+
+    def popularity(self, items):
+        """
+        Returns the popularity of the items
+        items: array of items
+        """
+        return np.asarray(self.prob)[items]
+
+    def solve(self, items):
+        """
+        Calculates the optimal refresh rates of the items
+        items: array of items
+        Returns array of refresh rates
+        """
+        eps = 1e-15
+        cca, cch = self.cost[1], self.cost[2]
+        lam = self.lambda_[items]
+        lam2 = lam**2
+        a = self.beta*self.cost[3]*self.popularity(items)*lam
+
+        # Bracket of the roots, clipped to the upper bound lambda
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lo = np.sqrt(a/(cca+cch)) if cca+cch > 0 else lam.copy()
+            hi = np.sqrt(a/cch) if cch > 0 else lam.copy()
+        hi = np.minimum(hi, lam)
+        lo = np.minimum(lo, hi)
+
+        def slope(rr, lam, lam2, a):
+            return cch + cca*lam2/(lam+rr)**2 - a/(rr+eps)**2
+
+        def curvature(rr, lam, lam2, a):
+            return -2*cca*lam2/(lam+rr)**3 + 2*a/(rr+eps)**3
+
+        # The cost of an item which is never requested is least at 0 and the cost
+        # of an item whose slope is negative at lambda is least at lambda
+        rr = hi.copy()
+        rr[a <= 0] = 0
+        active = np.flatnonzero((a > 0) & (lo < hi))
+        active = active[slope(hi[active], lam[active], lam2[active], a[active]) > 0]
+        # Starting from the last refresh rates of the items solved before
+        warm = active[~np.isnan(self.solved[items[active]])]
+        rr[warm] = np.clip(self.mu_hat[items[warm]], lo[warm], hi[warm])
+
+        for _ in range(self.maxiter):
+            if active.shape[0] == 0:
+                break
+            x, l, h = rr[active], lo[active], hi[active]
+            args = (lam[active], lam2[active], a[active])
+            g = slope(x, *args)
+            l = np.where(g < 0, x, l)
+            h = np.where(g < 0, h, x)
+            c = curvature(x, *args)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                new = x - g/c
+            # Bisection whenever the Newton step leaves the bracket
+            bad = ~((c > 0) & (new >= l) & (new <= h))
+            new[bad] = (l[bad] + h[bad])/2
+            rr[active], lo[active], hi[active] = new, l, h
+            active = active[np.abs(new - x) > self.tol*np.abs(x)]
+        return rr
+
+    def stale(self, items, prob):
+        """
+        Finds the items whose popularity changed by more than rtol since they were solved
+        items: array of items
+        prob: current popularity of the items
+        Returns boolean array, True for the items to be solved again
+        """
+        solved = self.solved[items]
+        # Never solved items are nan and are always stale
+        return ~(np.abs(prob - solved) <= self.rtol*solved)
+
+    def minimize_cost(self):
+        """
+        Calculates the optimal refresh rates of the cache, solving again only the items whose
+        popularity changed by more than rtol since they were solved
+        Returns the optimal refresh rates of the cache
+        """
+        d = np.asarray(self.C_hat, dtype=int)
+        prob = self.popularity(d)
+        mask = self.stale(d, prob)
+        changed = d[mask]
+        if changed.shape[0] > 0:
+            self.mu_hat[changed] = self.solve(changed)
+            self.solved[changed] = prob[mask]
+        return self.mu_hat[d]
+
+# CMDR whose cost per request depends on the cache size and not on the library size.
+# The popularity is read lazily as arr[i]/total from the counters and their running total.
+# CMDRM: the marginal costs of the cached items are kept in a max-heap, updated with the
+#        current popularity, and only the marginal cost of the request is calculated on a miss.
+# CMDRP: the most popular items are maintained by a TopK of the counters instead of sorting
+#        the popularity, ties are broken in favour of the cached items.
+class IncrementalCMDR(SeparableCMDR):
+    def __init__(self, cache_size, beta, z, lambda_param, L, Cost, cache_update = 'marg', seed = 7, prob = [], C_hat=[], tol=1e-12, maxiter=100, rtol=1e-3):
+        """
+        Refer to CMDR and SeparableCMDR to understand variables
+        """
+        self.total = 0 # sum of the counters
+        self.marg = IndexedHeap(reverse=True) # marginal costs of the cached items
+        self.freq = TopK(cache_size) # counters of the most popular items
+        super().__init__(cache_size=cache_size, beta=beta, z=z, lambda_param=lambda_param, L=L, Cost=Cost,
+                         cache_update=cache_update, seed=seed, prob=prob, C_hat=C_hat, tol=tol, maxiter=maxiter,
+                         rtol=rtol)
+        self.cached = set(self.C_hat.tolist())
+        for item in self.C_hat.tolist():
+            self.freq.set(item, 0)
+
+    @property
+    def prob(self):
+        """
+        Popularity of the items in the library, calculated from the counters if it is not given
+        """
+        if not self.calpop:
+            return self._prob
+        if self.total == 0:
+            return np.zeros((self.L,))
+        return self.arr/self.total
+
+    @prob.setter
+    def prob(self, prob):
+        self._prob = np.asarray(prob)
+
+    def popularity(self, items):
+        if not self.calpop:
+            return self._prob[items]
+        if self.total == 0:
+            return np.zeros(np.shape(items))
+        return self.arr[items]/self.total
+
+    def marg_cost(self, items=None):
+        """
+        Calculates the marginal costs
+        items: array of items, Default is the entire library
+        Returns the marginal cost vector
+        """
+        if items is None:
+            return super().marg_cost()
+        eps = 1e-15
+        mu = self.mu_hat[items]
+        lam = self.lambda_[items]
+        return mu*self.cost[2] + ((mu*lam)/(lam + mu))*self.cost[1] + \
+            self.beta*self.popularity(items)*(((self.cost[3]*lam)/(mu+eps))-self.cost[0])
+
+    def minimize_cost(self):
+        """
+        Calculates the optimal refresh rates of the cache, solving again only the items whose
+        popularity changed by more than rtol since they were solved, and updates the marginal costs
+        Returns the optimal refresh rates of the cache
+        """
+        d = self.C_hat
+        prob = self.popularity(d)
+        mask = self.stale(d, prob)
+        changed = d[mask]
+        if changed.shape[0] > 0:
+            self.mu_hat[changed] = self.solve(changed)
+            self.solved[changed] = prob[mask]
+        # The marginal costs depend on the current popularity even if the refresh rates aren't solved again
+        if self.upd == 'marg' and (changed.shape[0] > 0 or self.calpop):
+            for item, mc in zip(d.tolist(), self.marg_cost(d).tolist()):
+                self.marg.push(item, mc)
+        return self.mu_hat[d]
+
+    def cache_update(self, req):
+        """
+        Updates the cache
+        req: Request
+        """
+        if len(self.C_hat) < self.cache_size:
+            if req not in self.cached:
+                self.C_hat = np.append(self.C_hat, req)
+                self.cached.add(req)
+        else:
+            self.mu_hat[self.C_hat] = self.minimize_cost()
+            if self.upd == 'marg':
+                if req not in self.cached:
+                    mc = self.marg_cost(np.array([req]))[0]
+                    item_rem, worst = self.marg.peek()
+                    if worst > mc:
+                        self.marg.remove(item_rem)
+                        self.marg.push(req, mc)
+                        self.cached.remove(item_rem)
+                        self.cached.add(req)
+                        self.C_hat = np.append(self.C_hat[self.C_hat != item_rem], req)
+            elif self.upd == 'pop':
+                if req in self.freq.top and req not in self.cached:
+                    self.C_hat = np.array(self.freq.items(), dtype=int)
+                    self.cached = set(self.C_hat.tolist())
+
+    def counter_update(self, req):
+        """
+        Increases the counter of the library items
+        req: Request
+        """
+        self.arr[req] += 1
+        self.total += 1
+        if self.upd == 'pop':
+            self.freq.set(req, self.arr[req])
+
+    def counter_update_many(self, reqs):
+        """
+        Increases the counters with a batch of requests, same as calling counter_update for each request
+        reqs: array of requests
+        """
+        reqs = np.asarray(reqs, dtype=np.int64)
+        super().counter_update_many(reqs)
+        self.total += reqs.shape[0]
+        if self.upd == 'pop':
+            for item in np.unique(reqs).tolist():
+                self.freq.set(item, self.arr[item])
+
+    def currcache(self, req):
+        """
+        Calculates and Returns the current cache
+        """
+        if self.calpop:
+            self.counter_update(req)
+            self.cache_update(req)
+        return self.C_hat
@@ -1,5 +1,6 @@
 import random
 from cachingalgo.full_observation.single_cache import LRU
+from cachingalgo.structures import SegmentedLRU
 
 
 # LRUm algorithm consists of v virtual caches, f-v caches of total size m.
@@ -184,3 +185,110 @@ class fLRU:
         Returns the current cache
         """
         return self.collection[-1]
+
+# LRUm built on segmented LRU, the cost of a request doesn't depend on f or the list sizes
+class OrderedLRUm(LRUm):
+    def __init__(self, size, f, v, L):
+        """
+        size: vector of length f which specifies the length of each list
+               If length = 1 and f > 1, all the lists have same length
+        f: Total no. of lists used in the algorithm
+        v: No. of lists used as virtual Caches.
+        L: Library size
+        """
+        super().__init__(size=size, f=f, v=v, L=L)
+        if f == 1:
+            self.collection = [self.cache]
+            del self.cache
+        self.lists = SegmentedLRU(self.collection)
+        del self.collection
+        # Lists that are used as virtual caches
+        self.v = f - self.cnum
+
+    def update(self, req):
+        """
+        Updates the f lists
+        req: Request
+        """
+        levels = self.lists.levels(req)
+
+        if levels:
+            listnum = next(iter(levels))
+            if listnum < self.f-1:
+                # moves the req to the front of listnum + 1 and the last element of listnum + 1
+                # is moved to the front of listnum
+                self.lists.remove(listnum, req)
+                temp = self.lists.pop(listnum+1)
+                self.lists.push(listnum, temp)
+                self.lists.push(listnum+1, req)
+            else:
+                # moves the req to the front
+                self.lists.touch(listnum, req)
+
+        # adds the ele at the front of list 1 and discards the last element of that list.
+        else:
+            self.lists.pop(0)
+            self.lists.push(0, req)
+
+    def __contains__(self, req):
+        """
+        Magic method to use "in" keyword
+        req: request
+        """
+        levels = self.lists.levels(req)
+        return len(levels) > 0 and next(iter(levels)) >= self.v
+
+    def currcache(self):
+        """
+        Returns iterators over the lists used as cache from the most recently used item
+        """
+        return [self.lists.items(k) for k in range(self.v, self.f)]
+
+# fLRU built on segmented LRU, only the lists holding the request are updated
+class OrderedfLRU(fLRU):
+    def __init__(self, f, size, L):
+        """
+        f: total no. of caches
+        size: vector of length f which specifies the length of each list
+               If length = 1 and f > 1, all the lists have same length
+        L: Library Size
+        """
+        super().__init__(f=f, size=size, L=L)
+        self.lists = SegmentedLRU(self.collection)
+        del self.collection
+
+    def update(self, req):
+        """
+        Updates the f lists
+        req: Request
+        """
+        levels = set(self.lists.levels(req))
+
+        # if the req is not in the collection of lists then insert it in the first list.
+        if not levels:
+            self.lists.pop(0)
+            self.lists.push(0, req)
+            return
+
+        for i in levels:
+            # if the req is present in the ith list, move it to the first position
+            self.lists.touch(i, req)
+
+            # if the req is present in the ith list but not in i+1th list, move it
+            # to the first position of the i+1th list and discard the last item of the i+1th list.
+            if i+1 < self.f and i+1 not in levels:
+                self.lists.pop(i+1)
+                self.lists.push(i+1, req)
+
+    def __contains__(self, req):
+        """
+        Magic method to use "in" keyword
+        req: request
+        """
+        return (self.f-1) in self.lists.levels(req)
+
+    def currcache(self):
+        """
+        Returns an iterator over the cache from the most recently used item
+        """
+        return self.lists.items(self.f-1)
@@ -1,7 +1,9 @@
 import numpy as np
-from collections import deque
+from collections import deque, OrderedDict
+from collections.abc import Mapping
 import math
 import random
+from cachingalgo.structures import FrequencyBuckets, IndexedHeap, KineticTournament, TopK
 
 # Least Frequently Used
 class LFU:
@@ -21,6 +23,13 @@ class LFU:
         """
         self.arr[req] += 1
 
+    def update_many(self, reqs):
+        """
+        Updates the counters with a batch of requests, same as calling update for each request
+        reqs: array of requests
+        """
+        self.arr += np.bincount(np.asarray(reqs, dtype=np.int64), minlength=self.arr.shape[0])
+
     def currcache(self, Return = True, exclude = []):
         """
         To find the cache using LFU
@@ -47,6 +56,77 @@ class LFU:
         """
         return np.count_nonzero(self.arr)
 
+# LFU which maintains the cache incrementally instead of sorting the counters on every request
+class BucketLFU(LFU):
+    def __init__(self, L, cache_size):
+        """
+        L : Library size
+        cache_size: Size of the Cache
+        """
+        super().__init__(L=L, cache_size=cache_size)
+        # Counters of the cached items grouped into frequency buckets
+        self.cache = FrequencyBuckets()
+
+    def update(self, req):
+        """
+        Updates the counter of the request and the cache in O(1)
+        req: request
+        Returns True if the request is a hit i.e present in the cache before the update
+        """
+        self.arr[req] += 1
+        count = int(self.arr[req])
+
+        if req in self.cache:
+            self.cache.increment(req)
+            return True
+
+        if len(self.cache) < self.cache_size:
+            self.cache.add(req, count)
+        else:
+            # Items outside the cache are never counted more than the least frequent cached item,
+            # so the request can replace it only when it's count exceeds that item by one
+            item, mincount = self.cache.lowest()
+            if count > mincount:
+                self.cache.remove(item)
+                self.cache.add(req, count)
+        return False
+
+    def update_many(self, reqs):
+        """
+        Updates the counters and the cache with a batch of requests
+        reqs: array of requests
+        """
+        # The cache depends on the order of the requests, so they are applied one by one
+        for req in np.asarray(reqs).tolist():
+            self.update(req)
+
+    def __contains__(self, req):
+        """
+        Magic method to use "in" keyword
+        req: request
+        """
+        return req in self.cache
+
+    def currcache(self, Return = True, exclude = []):
+        """
+        To find the cache using LFU
+        exclude: items that are to be excluded from the library while finding cache
+        Return: True - returns the current cache or False - doesn't return
+        Returns the current cache in decreasing order of the counters
+        """
+        # Excluding items changes the top-C, so it is calculated from all the counters
+        if len(exclude) != 0:
+            return super().currcache(Return=Return, exclude=exclude)
+        if Return:
+            return np.array(self.cache.top(self.cache_size), dtype=int)
+
+    def popularity(self):
+        """
+        Returns the popularity of the items in the Library
+        """
+        self.prob = self.arr/np.sum(self.arr)
+        return self.prob
+
 # Window LFU
 class WLFU:
     def __init__(self, L, cache_size, window=None, F=[]):
@@ -126,6 +206,66 @@ class WLFU:
             else:
                 self.dic[req] = self.F[req]
 
+    def update_many(self, reqs):
+        """
+        Updates the window with a batch of requests, the window and the counts (including the
+        order of the items in self.dic, which breaks the ties in currcache) are the same as
+        calling update for each request
+        reqs: array of requests
+        """
+        reqs = np.asarray(reqs, dtype=np.int64)
+        n = reqs.shape[0]
+        if n == 0:
+            return
+        # Weighted counts are floats, so they are updated in the same order as update
+        if self.state:
+            for req in reqs.tolist():
+                self.update(req)
+            return
+
+        # The request j expires the j-th oldest request of the window
+        if n < len(self.q):
+            q = self.q
+            expired = np.array([q.pop() for _ in range(n)], dtype=np.int64)
+            q.extendleft(reqs.tolist())
+        else:
+            # Batch longer than the window, some of the requests expire within the batch
+            timeline = np.concatenate((np.array(self.q, dtype=np.int64)[::-1], reqs))
+            expired = timeline[:n]
+            self.q = deque(timeline[n:][::-1].tolist())
+
+        # Events in the order of update: at step j, expired[j] is decremented before reqs[j] is incremented
+        items = np.concatenate((expired, reqs))
+        steps = np.concatenate((2*np.arange(n), 2*np.arange(n)+1))
+        delta = np.concatenate((-np.ones(n, dtype=np.int64), np.ones(n, dtype=np.int64)))
+        order = np.lexsort((steps, items))
+        items, steps, delta = items[order], steps[order], delta[order]
+
+        # Running count of each item after each of it's events
+        uniq, first, inverse = np.unique(items, return_index=True, return_inverse=True)
+        initial = np.array([self.dic.get(i, 0) for i in uniq.tolist()], dtype=np.int64)
+        running = np.cumsum(delta)
+        offset = initial - np.concatenate(([0], running))[first]
+        counts = running + offset[inverse]
+
+        # An item is (re)inserted into self.dic when it's count goes from 0 to 1
+        inserted = (delta == 1) & (counts == 1)
+        last = np.full(uniq.shape[0], -1)
+        np.maximum.at(last, inverse[inserted], steps[inserted])
+        final = counts[np.r_[first[1:], items.shape[0]] - 1]
+
+        for i, c, t in zip(uniq.tolist(), final.tolist(), last.tolist()):
+            if c == 0:
+                self.dic.pop(i, None)
+            elif t < 0:
+                self.dic[i] = c
+            else:
+                # Removed for now and reinserted below in the order of the last insertion
+                self.dic.pop(i, None)
+        for k in np.argsort(last, kind='stable').tolist():
+            if last[k] >= 0 and final[k] > 0:
+                self.dic[int(uniq[k])] = int(final[k])
+
     def currcache(self):
         """
         to find the cache according frequency of items in window
@@ -135,6 +275,226 @@ class WLFU:
         sort_arr = dict(sorted(self.dic.items(), key= lambda x:x[1], reverse = True)[:self.cache_size]).keys()
         return np.array(list(sort_arr))
 
+# Window LFU which keeps the counts of the window sorted instead of sorting them on every call.
+# The window is a ring buffer of int32 instead of a deque.
+class BucketWLFU(WLFU):
+    def __init__(self, L, cache_size, window=None, F=[]):
+        """
+        window: Size of the window
+        L: Library size
+        F: Freshness constraints of the library items and size = L
+        cache_size: Cache Size
+        """
+        # The randomly intialised window of WLFU is stored in the ring by the setter of q
+        super().__init__(L=L, cache_size=cache_size, window=window, F=F)
+        # WLFU replaces the counts with a dictionary of it's own after initialising the window
+        self.count()
+
+    @property
+    def q(self):
+        """
+        Window of the requests from the newest request as in WLFU, a copy of the ring
+        """
+        return deque(np.roll(self.ring, -self.pos)[::-1].tolist())
+
+    @q.setter
+    def q(self, window):
+        """
+        Replaces the window and counts it again
+        window: requests from the newest request
+        """
+        self.ring = np.array(list(window), dtype=np.int32)[::-1].copy() # requests from the oldest request
+        self.pos = 0 # position of the oldest request in the ring
+        self.window = self.ring.shape[0]
+        self.count()
+
+    def count(self):
+        """
+        Counts the requests of the window
+        """
+        if not self.state:
+            # Each update changes the counts by one, so frequency buckets give O(1) updates
+            self.freq = FrequencyBuckets()
+            for i in self.ring.tolist():
+                self.freq.increment(i)
+            self.dic = self.freq.count
+        else:
+            # Counts are weighted by F, so the top items are maintained using heaps
+            self.freq = TopK(self.cache_size)
+            self.occur = {} # No. of occurences of the items in the window
+            for i in self.ring.tolist():
+                self.occur[i] = self.occur.get(i, 0) + 1
+            self.dic = {}
+            for i in self.occur:
+                self.dic[i] = self.occur[i]*self.F[i]
+                self.freq.set(i, self.dic[i])
+
+    def update(self, req):
+        """
+        Updates the window used in WLFU
+        req: request
+        """
+
+        #replaces the oldest request of the window with the new request
+        rem = int(self.ring[self.pos])
+        self.ring[self.pos] = req
+        self.pos = (self.pos + 1) % self.window
+
+        if not self.state:
+            self.freq.decrement(rem)
+            self.freq.increment(req)
+        else:
+            #Decreasing the count or removing the request
+            self.occur[rem] -= 1
+            if self.occur[rem] == 0:
+                del self.occur[rem]
+                del self.dic[rem]
+                self.freq.remove(rem)
+            else:
+                self.dic[rem] = self.occur[rem]*self.F[rem]
+                self.freq.set(rem, self.dic[rem])
+
+            #Increasing the count or appending the request
+            self.occur[req] = self.occur.get(req, 0) + 1
+            self.dic[req] = self.occur[req]*self.F[req]
+            self.freq.set(req, self.dic[req])
+
+    def update_many(self, reqs):
+        """
+        Updates the window with a batch of requests
+        reqs: array of requests
+        """
+        # Order of the items in the buckets depends on the order of the requests
+        for req in np.asarray(reqs).tolist():
+            self.update(req)
+
+    def currcache(self):
+        """
+        to find the cache according frequency of items in window
+        Returns the current cache
+        """
+        if not self.state:
+            return np.array(self.freq.top(self.cache_size), dtype=int)
+        else:
+            return np.array(self.freq.members(), dtype=int)
+
+
+# Counter bank of LFU-Lite stored in numpy arrays. Every tracked item gets a slot holding
+# the time at which it was added and it's no. of occurences, so that the popularity
+# estimates of all the items are calculated in one vectorized operation.
+class CounterBank:
+    def __init__(self, size=1024):
+        """
+        size: initial no. of slots, doubled whenever the bank is full
+        """
+        self.slot = {} # item -> slot
+        self.items = np.zeros((size,), dtype=np.int64)
+        self.time = np.zeros((size,), dtype=np.int64)
+        self.count = np.zeros((size,), dtype=np.int64)
+        self.n = 0 # No. of slots used
+
+    def __len__(self):
+        return self.n
+
+    def __contains__(self, item):
+        return item in self.slot
+
+    def __iter__(self):
+        return iter(self.slot)
+
+    def add(self, item, time):
+        """
+        Adds the item to the counter bank with one occurence or resets it if already present
+        item: library item
+        time: time at which the item is added
+        """
+        if item in self.slot:
+            s = self.slot[item]
+        else:
+            if self.n == self.items.shape[0]:
+                self.items = np.concatenate((self.items, np.zeros_like(self.items)))
+                self.time = np.concatenate((self.time, np.zeros_like(self.time)))
+                self.count = np.concatenate((self.count, np.zeros_like(self.count)))
+            s = self.n
+            self.n += 1
+            self.slot[item] = s
+            self.items[s] = item
+        self.time[s] = time
+        self.count[s] = 1
+
+    def increment(self, item):
+        """
+        Increases the occurences of the item if it is present in the counter bank
+        item: library item
+        """
+        s = self.slot.get(item)
+        if s is not None:
+            self.count[s] += 1
+
+    def estimate(self, item, ithreq):
+        """
+        Calculates the popularity estimate of a single item
+        item: library item
+        ithreq: no. of request algorithm processed so far
+        """
+        s = self.slot[item]
+        if self.time[s] == (ithreq+1):
+            return 0
+        # Counting the appearnces after it is been added to the counterbank
+        return (self.count[s]-1)/((ithreq+1)-self.time[s])
+
+    def estimates(self, ithreq):
+        """
+        Calculates the popularity estimates of all the items in the counter bank
+        ithreq: no. of request algorithm processed so far
+        Returns array of estimates in the order of the slots
+        """
+        elapsed = (ithreq+1) - self.time[:self.n]
+        est = np.zeros((self.n,))
+        np.divide(self.count[:self.n]-1, elapsed, out=est, where=elapsed != 0)
+        return est
+
+    def top(self, k, ithreq, exclude=[]):
+        """
+        Finds the items with the k largest estimates using a partial sort
+        k: no. of items
+        ithreq: no. of request algorithm processed so far
+        exclude: items whose estimates are taken as 0
+        Returns array of items in decreasing order of estimates
+        """
+        est = self.estimates(ithreq)
+        for item in exclude:
+            if item in self.slot:
+                est[self.slot[item]] = 0
+        if k < self.n:
+            part = np.sort(np.argpartition(-est, k-1)[:k])
+        else:
+            part = np.arange(self.n)
+        order = part[np.argsort(-est[part], kind='stable')]
+        return self.items[order]
+
+
+# Popularity estimates of the counter bank at a fixed time, calculated only when they are read
+class BankEstimates(Mapping):
+    def __init__(self, bank, ithreq):
+        """
+        bank: CounterBank
+        ithreq: no. of request algorithm processed so far
+        """
+        self.bank = bank
+        self.ithreq = ithreq
+
+    def __getitem__(self, item):
+        return self.bank.estimate(item, self.ithreq)
+
+    def __contains__(self, item):
+        return item in self.bank
+
+    def __iter__(self):
+        return iter(self.bank)
+
+    def __len__(self):
+        return len(self.bank)
 
 class LFULite:
     def __init__(self, L, cache_size, window=None, F=[]):
@@ -212,6 +572,56 @@ class LFULite:
         """
         return len(self.counterbank)
 
+# LFU-Lite with the counter bank stored in numpy arrays and the window counts kept sorted
+class ArrayLFULite(LFULite):
+    def __init__(self, L, cache_size, window=None, F=[]):
+        """
+        window: window size of WLFU
+        L: Library Size
+        cache_size: Cache Size
+        F: Freshness Constraints of the library items
+        """
+        self.L = L
+        self.cache_size = cache_size
+        self.counterbank = CounterBank()
+        self.wlfu = BucketWLFU(L=L, cache_size=cache_size, F=F, window=window)
+        self.prob = {} # Item id and it's probability
+
+    def update(self, req, ithreq, wlfu = True):
+        """
+        Update the counterbank and counter in WLFU
+        req: request
+        wlfu: whether to update the wlfu counter bank or not
+        ithreq: no. of request algorithm processed so far
+        """
+        #Update the counter of the WLFU
+        if wlfu:
+            self.wlfu.update(req)
+
+        #If present in the counterbank it increases the count.
+        self.counterbank.increment(req)
+
+        #Appending the most frequent items in the window that are not in counterbank
+        for j in self.wlfu.currcache():
+            if j not in self.counterbank:
+                self.counterbank.add(j, ithreq+1)
+
+    def currcache(self, ithreq, Return = True, exclude = []):
+        """
+        to find the cache according to LFULite
+        ithreq: how many request that are given to the algorithm till now
+        exclude: items to be excluded while calculating the cache
+        Return: True - returns the current cache or False - doesn't return
+        Returns the current cache
+        """
+        if ithreq > 0:
+            self.prob = BankEstimates(self.counterbank, ithreq)
+            if Return:
+                return self.counterbank.top(self.cache_size, ithreq, exclude)
+        else:
+            if Return:
+                return np.array(list(self.counterbank), dtype=int)
+
 class CountSketch:
     def __init__(self, l, b, L):
         """
@@ -273,6 +683,18 @@ class CountSketch:
         for i in range(self.l):
             self.cs[i,self.h[req][i]-1] += self.s[req][i]
 
+    def update_many(self, reqs):
+        """
+        Updates the cs counters with a batch of requests, same as calling update for each request
+        reqs: array of requests
+        """
+        uniq, counts = np.unique(np.asarray(reqs, dtype=np.int64), return_counts=True)
+        if uniq.shape[0] == 0:
+            return
+        cols = np.array([self.h[i] for i in uniq.tolist()]) - 1
+        signs = np.array([self.s[i] for i in uniq.tolist()])*counts[:, None]
+        np.add.at(self.cs, (np.arange(self.l)[None, :], cols), signs)
+
     def estimate(self, req):
         """
         Calculates the estimate of the requested item by finding median hi[r(t)]*si[r(t)]
@@ -316,6 +738,172 @@ class CountSketch:
 
         return np.array(self.cache)
 
+# Count Sketch with the h and s mapping functions computed from seeded universal hash functions
+# instead of being stored for every library item, all the l rows are updated at once.
+# The columns and signs of the cached items are stored when they are inserted, so the cached
+# items sharing a counter with a request are estimated again together.
+class HashCountSketch(CountSketch):
+    def __init__(self, l, b, L, seed=None):
+        """
+        l: No. of random functions for each s and h
+        b: No. of objects that h has to map from L
+        L: Library Size
+        seed: seed of the hash functions
+        """
+        self.l = l
+        self.b = b
+        self.L = L
+        # Coefficients of the hash functions ((a*x + c) mod p) where p is a mersenne prime
+        self.p = 2**31 - 1
+        rng = np.random.default_rng(seed)
+        self.ha = rng.integers(1, self.p, size=(l,), dtype=np.int64)
+        self.hc = rng.integers(0, self.p, size=(l,), dtype=np.int64)
+        self.sa = rng.integers(1, self.p, size=(l,), dtype=np.int64)
+        self.sc = rng.integers(0, self.p, size=(l,), dtype=np.int64)
+        self.rows = np.arange(l)
+        self.cs = np.zeros((l,b))
+        # Cache is of size C but as we are using zipf with parameter 1. C = b
+        self.slots = np.zeros((b,), dtype=np.int64) # cached items, the first self.size are in use
+        self.size = 0
+        self.cols = np.zeros((l, b), dtype=np.int64)  # columns of the cached items in each row
+        self.signs = np.zeros((l, b), dtype=np.int64) # signs of the cached items in each row
+        self.where = {}             # cached item -> position in self.slots
+        self.heap = IndexedHeap()   # estimates of the cached items, also used for the membership check
+        self.cells = {}             # (row, column) of cs -> set of cached items mapped to it
+
+    @property
+    def cache(self):
+        """
+        Cached items, a view of the stored array
+        """
+        return self.slots[:self.size]
+
+    def hash(self, req):
+        """
+        Calculates the h and s mapping values of the requests
+        req: Request or array of requests
+        Returns columns (0 to b-1) and signs (+1 or -1) of shape (l,) + shape of req
+        """
+        x = np.asarray(req, dtype=np.int64)
+        cols = (np.multiply.outer(self.ha, x) + self.hc.reshape((-1,) + (1,)*x.ndim)) % self.p % self.b
+        signs = 2*((np.multiply.outer(self.sa, x) + self.sc.reshape((-1,) + (1,)*x.ndim)) % self.p % 2) - 1
+        return cols, signs
+
+    def reestimate(self, positions):
+        """
+        Calculates the estimates of the cached items at the positions together and updates the heap
+        positions: list of positions in self.slots
+        """
+        est = np.median(self.cs[self.rows[:, None], self.cols[:, positions]]*self.signs[:, positions], axis=0)
+        for item, value in zip(self.slots[positions].tolist(), est.tolist()):
+            self.heap.push(item, value)
+
+    def add(self, req):
+        """
+        Updates the cs counters with the request and the estimates of the cached items sharing a counter with it
+        req: Request
+        Returns the columns and signs of the request
+        """
+        cols, signs = self.hash(req)
+        self.cs[self.rows, cols] += signs
+
+        changed = set()
+        for i, col in enumerate(cols.tolist()):
+            changed.update(self.cells.get((i, col), ()))
+        if changed:
+            self.reestimate([self.where[item] for item in changed])
+        return cols, signs
+
+    def update(self, req):
+        """
+        Updates the cs counters which is a l*b array
+        req: Request
+        """
+        self.add(req)
+
+    def update_many(self, reqs):
+        """
+        Updates the cs counters with a batch of requests
+        reqs: array of requests
+        """
+        cols, signs = self.hash(reqs)
+        np.add.at(self.cs, (self.rows[:, None], cols), signs)
+
+        # Estimates of all the cached items are calculated once for the batch
+        if self.size > 0:
+            self.reestimate(list(range(self.size)))
+
+    def estimate(self, req, cols=None, signs=None):
+        """
+        Calculates the estimate of the requested item by finding median hi[r(t)]*si[r(t)]
+        req: Request
+        cols, signs: hash of the request if it is already calculated
+        """
+        if cols is None:
+            cols, signs = self.hash(req)
+        return np.median(self.cs[self.rows, cols]*signs)
+
+    def min_est(self):
+        """
+        Finds the minimum estimate of the cache and it's position from the heap
+        Returns position and minimum value
+        """
+        item, est = self.heap.peek()
+        return self.where[item], est
+
+    def insert(self, req, index=None, cols=None, signs=None):
+        """
+        Inserts the request into the cache
+        req: Request
+        index: position of the cache item to be replaced or None to append
+        cols, signs: hash of the request if it is already calculated
+        """
+        if cols is None:
+            cols, signs = self.hash(req)
+        if index is None:
+            index = self.size
+            self.size += 1
+        else:
+            rem = int(self.slots[index])
+            self.heap.remove(rem)
+            del self.where[rem]
+            for i, col in enumerate(self.cols[:, index].tolist()):
+                self.cells[(i, col)].discard(rem)
+
+        self.slots[index] = req
+        self.cols[:, index] = cols
+        self.signs[:, index] = signs
+        self.where[req] = index
+        for i, col in enumerate(cols.tolist()):
+            self.cells.setdefault((i, col), set()).add(req)
+        self.heap.push(req, self.estimate(req, cols, signs))
+
+    def __contains__(self, req):
+        """
+        Magic method to use "in" keyword
+        req: request
+        """
+        return req in self.heap
+
+    def currcache(self, req):
+        """
+        Updates the cs counter and inserts the request into the cache
+        req: Request
+        Returns the current cache, a view of the stored array which changes with the later requests
+        """
+        cols, signs = self.add(req)
+        if req not in self.heap:
+            # If length of cache is less than b, adding the request to the cache
+            if self.size < self.b:
+                self.insert(req, cols=cols, signs=signs)
+            else:
+                # Replacing the item with minimum estimate if the request has larger estimate
+                ind, est = self.min_est()
+                if self.estimate(req, cols, signs) > est:
+                    self.insert(req, ind, cols, signs)
+
+        return self.cache
+
 # Least Recently Used
 class LRU:
     def __init__(self, cache_size, L):
@@ -358,6 +946,43 @@ class LRU:
         "Returns the current cache"
         return self.cache
 
+# LRU backed by an ordered dict, so that hit, promotion and eviction are O(1)
+class OrderedLRU(LRU):
+    def __init__(self, cache_size, L):
+        """
+        cache_size: Cache Size
+        L: Library Size
+        """
+        super().__init__(cache_size=cache_size, L=L)
+        # The least recently used item is at the start and the most recently used item at the end
+        self.cache = OrderedDict.fromkeys(reversed(self.cache))
+
+    def update(self, req):
+        """
+        Updates the elements in the cache
+        req: request
+        Returns True if the request is a hit
+        """
+        # If present in the cache, move the item to the most recently used end
+        if req in self.cache:
+            self.cache.move_to_end(req)
+            return True
+        # else remove the least recently used item and insert the request at the other end
+        self.cache.popitem(last=False)
+        self.cache[req] = None
+        return False
+
+    def __contains__(self, req):
+        """
+        Magic method to use "in" keyword
+        req: request
+        """
+        return req in self.cache
+
+    def currcache(self):
+        "Returns an iterator over the current cache from the most recently used item"
+        return reversed(self.cache)
+
 # Least Useful: Refer LFU, LFULite and WLFU algorithms to understand.
 class LU:
     def __init__(self, L, F, cache_size, arr = [], method = '', useF = False, freqtop=None, window=None):
@@ -387,7 +1012,7 @@ class LU:
             self.arr = np.zeros((L,))
             self.prob = np.zeros((L,))
         elif self.method == 'lfulite': # LFU-Lite maintains the popularity of the items only in the counter bank
-            self.arr = {} # Consists of key as video ID and value as list of [time, number of occurences]
+            self.arr = CounterBank() # Consists of the time at which video ID is added and number of occurences
             if useF:
                 self.wlfu = WLFU(L=L, cache_size=freqtop, F=F, window=window)
             else:
@@ -409,12 +1034,11 @@ class LU:
             # finds the most frequent items according to WLFU
             self.wlfu.update(req)
             currtop = self.wlfu.currcache()
-            if req in self.arr:
-                self.arr[req][1] += 1
+            self.arr.increment(req)
 
             for j in currtop:
                 if j not in self.arr:
-                    self.arr[j] = [ithreq+1, 1]
+                    self.arr.add(j, ithreq+1)
 
     def cache_update(self, req, time):
         """
@@ -443,10 +1067,8 @@ class LU:
         if self.method == 'lfu':
             distrib = self.arr/np.sum(self.arr)
         elif self.method == 'lfulite':
-            distrib = {i:0 for i in self.arr}
-            for k in distrib:
-                if self.arr[k][0] != (ithreq+1):
-                    distrib[k] = (self.arr[k][1]-1)/((ithreq+1)-self.arr[k][0])
+            # Estimates are calculated only for the items that are read
+            distrib = BankEstimates(self.arr, ithreq)
         self.prob = distrib
 
     def currcache(self, req, time, ithreq = None):
@@ -470,7 +1092,7 @@ class LU:
         # Check whether cache is full or not
         if len(self.fetchtime) < self.cache_size:
                 if self.method == 'lfulite' and req not in self.prob:
-                    self.arr[req] = [ithreq+1, 1] # storing the items that are in start of the cache
+                    self.arr.add(req, ithreq+1) # storing the items that are in start of the cache
                 self.fetchtime[req] = time + 1
                 miss_type = 1 # miss due to freshness constraint
         else:
@@ -491,3 +1113,143 @@ class LU:
     def popularity(self):
         "Return the popularity of the items used in the counterbank"
         return self.prob
+
+# Least Useful with the cache item of least utility maintained incrementally.
+# Utility of a cached item prob*(fetchtime+F-t) is linear in time, so the items are kept in a
+# kinetic tournament which is repaired only when an item is fetched or it's popularity changes.
+# The times in the tree are measured from self.origin, which is moved to the current time every
+# rebase_every time units, so the intercepts don't lose their precision on long traces.
+# For method = 'lfu' the counters are used instead of the probabilities as the normalisation
+# doesn't change the comparisons. For method = 'lfulite' the estimates of all the items
+# change on every request, so the utilities are calculated as in LU.
+class KineticLU(LU):
+    rebase_every = 2**20
+
+    def __init__(self, L, F, cache_size, arr = [], method = '', useF = False, freqtop=None, window=None):
+        """
+        L: Library Size
+        F: Freshness constant array of size L
+        cache_size: Size of the cache for the algorithm
+        freqtop: No. of the most frequent elements wlfu needs to consider
+        useF: use of F for WLFU
+        window: window size of the WLFU
+        arr: probability of library ites in case of LU algorithm.
+        method: 'lfu' or 'lfulite': Default is 'lfu' if arr is not given
+        """
+        super().__init__(L=L, F=F, cache_size=cache_size, arr=arr, method=method, useF=useF, freqtop=freqtop, window=window)
+        self.kinetic = self.method != 'lfulite'
+        self.tree = KineticTournament(cache_size)
+        self.origin = 0 # time from which the utilities in the tree are measured
+
+    def weight(self, item):
+        """
+        Returns the popularity of the item used in the utility
+        """
+        if self.calpop and self.method == 'lfu':
+            return self.arr[item]
+        return self.prob[item]
+
+    def fetch(self, item, time):
+        """
+        Stores the fetch time of the item and updates it's utility
+        item: library item
+        time: arrival time of the request
+        """
+        self.fetchtime[item] = time + 1
+        if self.kinetic:
+            self.refresh(item)
+
+    def refresh(self, item):
+        """
+        Updates the utility of the cached item in the tree
+        """
+        w = self.weight(item)
+        self.tree.set(item, w*(self.fetchtime[item] + self.F[item] - self.origin), w)
+
+    def elapsed(self, time):
+        """
+        Returns the time since the origin of the tree, the tree is rebuilt from the current time
+        once it exceeds rebase_every
+        time: current time
+        """
+        if time - self.origin >= self.rebase_every:
+            self.origin = time
+            self.tree = KineticTournament(self.cache_size)
+            for item in self.fetchtime:
+                self.refresh(item)
+        return time - self.origin
+
+    def cache_update(self, req, time):
+        """
+        Updates the cache based on the request and it's arrival time
+        req: Request
+        time: arrival time of the request
+        """
+        if not self.kinetic:
+            return super().cache_update(req, time)
+
+        self.tree.advance(self.elapsed(time+1))
+        minind, value = self.tree.peek()
+
+        if (self.weight(req)*self.F[req]) > value:
+            self.fetchtime.pop(minind)
+            self.tree.remove(minind)
+            self.fetch(req, time)
+
+    def popularity_update(self, req, ithreq):
+        """
+        Calculates and updates the popularity of the items used in the algorithm
+        req: Request
+        ithreq: no. of request algorithm processed so far
+        """
+        if self.method != 'lfu':
+            return super().popularity_update(req, ithreq)
+        # Only the counter of the request changes, normalisation is done in popularity()
+        self.update(req, ithreq = ithreq)
+        if req in self.tree:
+            self.refresh(req)
+
+    def currcache(self, req, time, ithreq = None):
+        """
+        Calculates the current cache
+        req: Request
+        time: Request arrival time
+        ithreq: no. of request algorithm processed so far
+        Returns: cache, cache_hit and miss_type
+        """
+        hit = 0
+        miss_type = -1 # Hit
+
+        if req >= self.L:
+            raise Exception("The request is not in the library")
+
+        # Updates the popularity
+        if self.calpop:
+            self.popularity_update(req, ithreq)
+
+        # Check whether cache is full or not
+        if len(self.fetchtime) < self.cache_size:
+                if self.method == 'lfulite' and req not in self.prob:
+                    self.arr.add(req, ithreq+1) # storing the items that are in start of the cache
+                self.fetch(req, time)
+                miss_type = 1 # miss due to freshness constraint
+        else:
+            if req in self.fetchtime:
+                if self.fetchtime[req] + self.F[req] >= (time + 1):
+                    hit = 1
+                else:
+                    self.fetch(req, time)
+                    miss_type = 1
+            else:
+                miss_type = 2 # miss due to not present in the cache
+
+                if self.method == 'lfu' or ((self.method == 'lfulite')^(req not in self.prob)):
+                    self.cache_update(req, time)
+
+        return {'cache':list(self.fetchtime.keys()), 'cache_hit':hit, 'miss_type':miss_type}
+
+    def popularity(self):
+        "Return the popularity of the items used in the algorithm"
+        if self.calpop and self.method == 'lfu':
+            self.prob = self.arr/np.sum(self.arr)
+        return self.prob
@@ -2,6 +2,7 @@ import numpy as np
 import random
 from collections import deque
 import math
+from cachingalgo.full_observation.single_cache import BucketWLFU
 
 # Caching Bandit Marginal Posterior Sampling
 class CBMPS:
@@ -52,6 +53,86 @@ class CBMPS:
                 if i != req:
                     self.param[i][1] += 1
 
+# CB-MPS with the parameters of the beta distributions stored in arrays, the posterior samples
+# of all the library items are drawn in one call and the cache is found with a partial sort.
+# On a hit every cached item except the request gets +1 beta, so the hits are counted and
+# added to the betas of the cache only when the cache changes.
+class ArrayCBMPS(CBMPS):
+    def __init__(self, L, cache_size, seed=None):
+        """
+        L: Library Size
+        cache_size: Cache Size
+        seed: seed of the random generator
+        """
+        self.L = L
+        self.cache_size = cache_size
+        self.rng = np.random.default_rng(seed)
+        # alpha and beta of the beta distribution of the library items
+        self.alpha = np.ones((L,))
+        self.beta = np.ones((L,))
+        self.cache = self.rng.choice(L, size=cache_size, replace=False)
+        # Membership of the library items in the cache
+        self.incache = np.zeros((L,), dtype=bool)
+        self.incache[self.cache] = True
+        # No. of hits on the current cache which are not yet added to the betas
+        self.hits = 0
+
+    def materialize(self):
+        """
+        Adds the pending hits to the betas of the cached items
+        """
+        if self.hits > 0:
+            self.beta[self.cache] += self.hits
+            self.hits = 0
+
+    def currcache(self, Return = False):
+        """
+        Calculates the current cache
+        Return: True - returns the currcache or False - void return
+        """
+        self.materialize()
+
+        # Generating the samples from the beta distribution for the items in the library.
+        samples = self.rng.beta(self.alpha, self.beta)
+
+        # Most popular items in decreasing order according to the samples
+        if self.cache_size < self.L:
+            top = np.argpartition(samples, self.L-self.cache_size)[self.L-self.cache_size:]
+        else:
+            top = np.arange(self.L)
+        top = top[np.argsort(samples[top])[::-1]]
+
+        #Updating the Current Cache
+        self.incache[self.cache] = False
+        self.cache = top
+        self.incache[self.cache] = True
+
+        if Return:
+            return self.cache
+
+    def __contains__(self, req):
+        """
+        Magic method to use "in" keyword
+        req: request
+        """
+        return self.incache[req]
+
+    def update(self, req):
+        """
+        Updates the paramters of the beta distribution
+        req: Request
+        """
+
+        #Updates only if the element is in the current cache
+        if self.incache[req]:
+            #incrementing the alpha of ele
+            self.alpha[req] += 1
+
+            #incrementing the beta of all items in the currcache except for ele,
+            #ele is corrected now and the others are incremented in materialize()
+            self.beta[req] -= 1
+            self.hits += 1
+
 # Caching Bandit Structural Information
 class CBSI:
     def __init__(self, L, cache_size, mu_c, delta):
@@ -152,6 +233,124 @@ class CBSI:
                 self.Lib[ele] = self.param[ele][0] / (self.param[ele][0] + self.param[ele][1])
 
 
+# CB-SI with the parameters and the popularities (Lib) stored in arrays. Set A is found with a
+# vectorized threshold and set B is sampled using Gumbel top-k. The beta increments of a hit
+# are applied lazily as in ArrayCBMPS, so that the cost of an update doesn't depend on the cache size.
+class ArrayCBSI(CBSI):
+    def __init__(self, L, cache_size, mu_c, delta, seed=None):
+        """
+        L: Library Size
+        cache_size: Cache Size
+        mu_c: Probability of most popular Cth library item
+        delta: Difference b/n probabilities of Cth and C+1 th most popular library items
+        seed: seed of the random generator
+        """
+        self.L = L
+        self.cache_size = cache_size
+        self.mu_c = mu_c
+        self.delta = delta
+        self.rng = np.random.default_rng(seed)
+        # alpha and beta of the library items
+        self.alpha = np.zeros((L,))
+        self.beta = np.zeros((L,))
+        # Probability of item
+        self.prob = np.full((L,), 1/L)
+        # Library used for sampling and the mask of the items present in it
+        self.Lib = self.prob.copy()
+        self.inlib = np.ones((L,), dtype=bool)
+        # Cache at time t
+        self.cache = self.rng.choice(L, size=cache_size, replace=False)
+        self.incache = np.zeros((L,), dtype=bool)
+        self.incache[self.cache] = True
+        # No. of hits on the current cache which are not yet added to the betas
+        self.hits = 0
+
+    def materialize(self):
+        """
+        Adds the pending hits to the betas of the cached items and updates their popularity
+        """
+        if self.hits > 0:
+            self.beta[self.cache] += self.hits
+            self.Lib[self.cache] = self.alpha[self.cache]/(self.alpha[self.cache] + self.beta[self.cache])
+            self.inlib[self.cache] = True
+            self.hits = 0
+
+    def compute_A(self):
+        """
+        Calculates the set A according to mu_c and delta
+        Returns array of items in A
+        """
+        return np.flatnonzero(self.inlib & (self.Lib >= (self.mu_c - (self.delta / 2))))
+
+    def sampling(self, items, weights, number):
+        """
+        Samples the items without replacement with probability proportional to the weights
+        using Gumbel top-k: the items with the largest log(weight) + Gumbel noise
+        Return Set B
+        """
+        keys = np.log(weights) + self.rng.gumbel(size=weights.shape[0])
+        if number < keys.shape[0]:
+            return items[np.argpartition(keys, keys.shape[0]-number)[keys.shape[0]-number:]]
+        return items
+
+    def currcache(self, Return = False):
+        """
+        Calculates the current cache
+        Return: True - returns the currcache or False - void return
+        """
+        self.materialize()
+
+        # Computing A
+        A = self.compute_A()
+
+        if len(A) >= self.cache_size:
+            # Most popular items of A in decreasing order
+            top = np.argpartition(self.Lib[A], len(A)-self.cache_size)[len(A)-self.cache_size:]
+            cache = A[top[np.argsort(self.Lib[A][top])[::-1]]]
+
+        else:
+            # Potential function for the items in the Lib other than in set A
+            rest = self.inlib.copy()
+            rest[A] = False
+            rest = np.flatnonzero(rest)
+            p = 1/((self.mu_c - self.Lib[rest])**2)
+
+            # Returns the setB which are sampled from the items that are not in setA according to potential
+            setB = self.sampling(rest, p, self.cache_size - len(A))
+
+            cache = np.concatenate((A, setB))
+
+        self.incache[self.cache] = False
+        self.cache = cache
+        self.incache[self.cache] = True
+
+        if Return:
+            return self.cache
+
+    def __contains__(self, req):
+        """
+        Magic method to use "in" keyword
+        req: request
+        """
+        return self.incache[req]
+
+    def update(self, req):
+        """
+        Updates the parameters of the algorithm
+        """
+
+        #Checks whether request present in cache
+        if self.incache[req]:
+
+            #Increase the alpha for the req
+            self.alpha[req] += 1
+
+            #Increase the beta for the items other than req, req is corrected now
+            #and the others are incremented in materialize()
+            self.beta[req] -= 1
+            self.hits += 1
+
+
 def calculate_delta(prob, cache_size):
     """
     Calculates the delta which mu_c - mu_c+1, and mu_c
@@ -227,3 +426,35 @@ class CBSILite(CBSI):
         for i in topfreq:
             if i not in self.Lib:
                 self.Lib[i] = self.prob[i]
+
+
+# CB-SILite built on ArrayCBSI, the counter bank is the mask of the items in Lib and the
+# window is a ring buffer whose most frequent items are kept in frequency buckets
+class ArrayCBSILite(ArrayCBSI):
+    def __init__(self, win=None, **kwargs):
+        """
+        win: Window Size
+        """
+        # Inherits the methods and attributes from ArrayCBSI Class
+        super().__init__(**kwargs)
+
+        if win == None:
+            win = int(self.cache_size*self.cache_size*math.log(self.L))
+
+        # Most frequently occuring items in the randomly initialised window
+        self.window = BucketWLFU(L=self.L, cache_size=self.cache_size, window=win)
+
+        #Counter_bank
+        self.inlib[:] = False
+
+    def counterbank_update(self, req):
+        """
+        Updates the Counter Bank
+        req: Request
+        """
+        self.window.update(req)
+        topfreq = self.window.currcache()
+
+        new = topfreq[~self.inlib[topfreq]]
+        self.Lib[new] = self.prob[new]
+        self.inlib[new] = True
@@ -1,9 +1,12 @@
 from collections import deque
+from functools import lru_cache
 import numpy as np
 import time
 import pickle
 from pathlib import Path
 
+DATA_PATH = Path(__file__).resolve().parents[1] / "data"
+
 class StaticZipf:
     def __init__(self, L, a):
         """
@@ -18,10 +21,16 @@ class StaticZipf:
         """
         Generates the 'count' no. of requests according to self.prob
         """
-        items = list(range(self.L))
-        req = np.random.choice(items, p = self.prob, size = count)
+        req = np.random.choice(self.L, p = self.prob, size = count)
         return req
 
+    def sampler(self, seed=None):
+        """
+        Returns a PopularitySampler of self.prob to generate requests in bulk
+        seed: seed of the random generator
+        """
+        return PopularitySampler(self.prob, seed=seed)
+
     def zipf(self, n, a):
         """
         n is the size
@@ -29,11 +38,8 @@ class StaticZipf:
         pdf of X, fx(X) = c/(x^a) where c = summation of (1/i)^a where i runs from 1 to n
         To get the top one element one has to substitute x = 1 and vice versa
         """
-        x = sum([(1/i)**a for i in range(1,n+1)])
-        y = [None]*n
-        for i in range(n):
-            y[i] = (1/(i+1)**a)*(1/x)
-        return np.array(y)
+        y = 1/np.arange(1, n+1, dtype=np.float64)**a
+        return y/np.sum(y)
 
     def rotatetop(self, y, top, step, direction):
         """
@@ -47,11 +53,67 @@ class StaticZipf:
 
 
 
-def szipf(L=100, count=10_000, a=1, silent=True):
+# Samples requests from a popularity profile. The CDF is calculated once and every batch of
+# requests is generated with one uniform draw and a binary search of the CDF.
+class PopularitySampler:
+    def __init__(self, prob, items=None, seed=None):
+        """
+        prob: Popularity profile of the library items
+        items: Item ids of the profile, Default is 0 to len(prob)-1
+        seed: seed of the random generator
+        """
+        self.prob = np.asarray(prob, dtype=np.float64)
+        self.items = None if items is None else np.asarray(items)
+        self.cdf = np.cumsum(self.prob)
+        self.total = self.cdf[-1]
+        self.cdf /= self.total
+        self.rng = np.random.default_rng(seed)
+
+    def refresh(self, end):
+        """
+        Recalculates the CDF of the first 'end' items after self.prob[:end] is permuted in place
+        """
+        cdf = self.cdf[:end]
+        np.cumsum(self.prob[:end], out=cdf)
+        cdf /= self.total
+
+    def sample(self, count, out=None):
+        """
+        Generates the 'count' no. of requests
+        count: No. of requests
+        out: optional int64 array of size count to store the requests
+        Returns array of requests
+        """
+        u = self.rng.random(count)
+        req = np.searchsorted(self.cdf, u, side='right')
+        # Guards against the rounding of the last value of the CDF
+        np.minimum(req, self.prob.shape[0]-1, out=req)
+        if self.items is not None:
+            req = self.items[req]
+        if out is None:
+            return req
+        out[:] = req
+        return out
+
+    def chunks(self, count, chunk_size=1_000_000):
+        """
+        Generates the 'count' no. of requests in chunks
+        count: Total no. of requests
+        chunk_size: No. of requests in each chunk
+        Yields array of requests
+        """
+        while count > 0:
+            size = min(chunk_size, count)
+            yield self.sample(size)
+            count -= size
+
+
+def szipf(L=100, count=10_000, a=1, silent=True, seed=None):
     """
     Generates the static zipf requests
 
     Refer to the Static Zipf Class to understand variables
+    seed: If given, requests are generated by PopularitySampler with this seed
     Returns the prob distribution and generated requests dictionary
     """
 
@@ -59,7 +121,10 @@ def szipf(L=100, count=10_000, a=1, silent=True):
 
     szipf = StaticZipf(L=L, a=a)
     prob = szipf.prob
-    req = szipf.req_gen(count)
+    if seed is None:
+        req = szipf.req_gen(count)
+    else:
+        req = szipf.sampler(seed).sample(count)
 
     if not silent:
         print(f'TimeTaken:{time.time() - start} sec')
@@ -99,51 +164,129 @@ def dzipf(L=100, count=10_000, req_step=1000, window=50, top=10, cache_size=10,
 
     return {'optim_cache':optimcache, 'req':req}
 
+def dzipf_stream(L=100, count=10_000, req_step=1000, window=50, top=10, cache_size=10, a=1, seed=None, chunk_size=None):
+    """
+    Generates the dynamic zipf requests lazily
+
+    Refer to the dzipf function to understand variables
+    seed: seed of the random generator
+    chunk_size: Max. no. of requests in each chunk, Default is req_step
+    Yields the optimal cache and a chunk of requests, the optimal cache changes every req_step requests
+    """
+
+    # Input checking
+    if not np.all([window < L, top < window, count % req_step == 0, top < L]):
+        raise ValueError("Input arguments are not valid")
+
+    if chunk_size is None:
+        chunk_size = req_step
+
+    sampler = StaticZipf(L=L, a=a).sampler(seed)
+    prob = sampler.prob
+    head = prob[:window]
+    # Only the top window items are permuted, so the ones outside it keep their order
+    n = min(cache_size, L)
+    part = head if n <= window else prob
+    for i in range(count//req_step):
+        optimcache = np.argpartition(part, part.shape[0]-n)[part.shape[0]-n:]
+        optimcache = optimcache[np.argsort(part[optimcache])[::-1]]
+        for chunk in sampler.chunks(req_step, chunk_size):
+            yield optimcache, chunk
+        head[:] = np.roll(head, top)
+        sampler.refresh(window)
+
+
+def convert_profile(name, data_path=DATA_PATH):
+    """
+    Converts the pickled popularity profile '<name>data.pkl' to '<name>_prob.npy' and,
+    if the pickle is a dictionary of item ids, '<name>_items.npy'
+
+    name: Name of the profile i.e netflix or youtube
+    data_path: Directory of the data files
+    """
+    data_path = Path(data_path)
+    with open(data_path / f"{name}data.pkl",'rb') as f:
+        profile = pickle.load(f)
+
+    if isinstance(profile, dict):
+        np.save(data_path / f"{name}_items.npy", np.fromiter(profile.keys(), dtype=np.int64, count=len(profile)))
+        profile = np.fromiter(profile.values(), dtype=np.float64, count=len(profile))
+    np.save(data_path / f"{name}_prob.npy", np.asarray(profile, dtype=np.float64))
+
+
+@lru_cache(maxsize=None)
+def load_profile(name, data_path=DATA_PATH):
+    """
+    Loads the popularity profile once per process. The converted .npy files are memory mapped
+    read-only so that the processes of a pool share the pages, otherwise the pickle is loaded.
+    The arrays are read-only either way, copy them before modifying.
+
+    name: Name of the profile i.e netflix or youtube
+    data_path: Directory of the data files
+    Returns the item ids (None if they are 0 to L-1) and the prob distribution
+    """
+    data_path = Path(data_path)
+    if not (data_path / f"{name}_prob.npy").exists():
+        with open(data_path / f"{name}data.pkl",'rb') as f:
+            profile = pickle.load(f)
+        items = None
+        if isinstance(profile, dict):
+            items = np.array(list(profile.keys()))
+            items.setflags(write=False)
+            profile = list(profile.values())
+        # Read-only as the arrays are shared by all the callers, same as the memory mapped files
+        prob = np.array(profile)
+        prob.setflags(write=False)
+        return items, prob
+
+    items = None
+    if (data_path / f"{name}_items.npy").exists():
+        items = np.load(data_path / f"{name}_items.npy", mmap_mode='r')
+    prob = np.load(data_path / f"{name}_prob.npy", mmap_mode='r')
+    return items, prob
+
+
 # Netflix Data is collected between 1998 and 2005
 # Library Size - 17, 770
 # Requests logs processed - 10_04_80_507
-def netflix(count=10_000, silent=True):
+def netflix(count=10_000, silent=True, seed=None):
     """
     Loads the popularity profile from netflixdata file and generates the requests
 
     count: No. of requests to be generated
+    seed: If given, requests are generated by PopularitySampler with this seed
     Returns the prob distribution and generated requests dictionary
     """
-    curr_path = Path(__file__).resolve().parents[1]
-    data_path = Path("./data/netflixdata.pkl")
-
-    with open(curr_path / data_path,'rb') as f:
-        popularity_dic = pickle.load(f)
-
-    items = list(popularity_dic.keys())
-    prob = list(popularity_dic.values())
+    items, prob = load_profile('netflix')
 
     start = time.time()
     # Random sampling
-    req = np.random.choice(items, p = prob, size = count)
+    if seed is None:
+        req = np.random.choice(items, p = prob, size = count)
+    else:
+        req = PopularitySampler(prob, items, seed).sample(count)
     if not silent:
         print(f'TimeTaken:{time.time()-start}sec')
     return {'prob':prob, 'req':req}
 
 
 # Library Size - 1,61,085
-def youtube(count=10_000, silent=True):
+def youtube(count=10_000, silent=True, seed=None):
     """
     Loads the popularity profile from youtube data file and generates the requests
 
     count: No. of requests to be generated
+    seed: If given, requests are generated by PopularitySampler with this seed
     Returns the prob distribution and generated requests dictionary
     """
-    curr_path = Path(__file__).resolve().parents[1]
-    data_path = Path("./data/youtubedata.pkl")
-
     start = time.time()
-    with open(curr_path / data_path,'rb') as f:
-        prob = pickle.load(f)
+    _, prob = load_profile('youtube')
 
-    items = list(range(prob.shape[0]))
     # Random Sampling
-    req = np.random.choice(items, p = prob, size = count)
+    if seed is None:
+        req = np.random.choice(prob.shape[0], p = prob, size = count)
+    else:
+        req = PopularitySampler(prob, seed=seed).sample(count)
     if not silent:
         print(f'TimeTaken:{time.time()-start}sec')
     return {'prob':prob, 'req':req}
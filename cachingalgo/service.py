@@ -0,0 +1,176 @@
+import asyncio
+import random
+from collections import deque
+import time
+import numpy as np
+from cachingalgo.simulate import adapt
+
+# Origin which serves every item after a simulated latency, a stand-in for the slow origin
+class SimulatedOrigin:
+    def __init__(self, latency=0.05, jitter=0.0, seed=None):
+        """
+        latency: mean latency of a fetch in seconds
+        jitter: the latency is uniform in [latency - jitter, latency + jitter]
+        seed: seed of the jitter
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.fetches = 0 # no. of fetches
+        self.active = 0 # no. of fetches in progress
+        self.peak = 0 # max. no. of fetches in progress at the same time
+
+    async def __call__(self, item):
+        """
+        Fetches the item
+        item: item
+        Returns the value of the item
+        """
+        self.fetches += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(max(self.latency + self.rng.uniform(-self.jitter, self.jitter), 0))
+        finally:
+            self.active -= 1
+        return (item, self.fetches)
+
+
+# Cache Service
+# Serves the values of the items with a caching algorithm deciding what is cached. A request is
+# answered from the stored values if the algorithm reports a hit, otherwise the value is fetched
+# from the origin, an async callable origin(item) returning the value. Concurrent misses of the same
+# item share a single fetch, which runs as a task of it's own so that cancelling any of the requests,
+# including the one which started it, doesn't fail the others. The algorithm is updated when the
+# request arrives, in the order of arrival, so it sees the same sequence of requests as the simulator.
+class CacheService:
+    def __init__(self, alg, origin, clock=None, prune_every=1000, window=100_000):
+        """
+        alg: Instance of the caching algorithm or a Policy e.g LRU(cache_size=100, L=L) or LU(L=L, F=F, ...)
+        origin: async function returning the value of an item, called as await origin(item)
+        clock: function returning the arrival time of a request e.g time.monotonic for the freshness
+               constraints of LU in seconds, Default is the index of the request
+        prune_every: the values of the items evicted by the algorithm are dropped after every prune_every requests,
+                     None never drops them
+        window: No. of the latest requests whose latencies are kept for the percentiles
+        """
+        if prune_every is not None and (not isinstance(prune_every, int) or prune_every < 1):
+            raise ValueError("prune_every should be a positive integer or None")
+        self.policy = adapt(alg)
+        self.origin = origin
+        self.clock = clock
+        self.prune_every = prune_every
+        self.values = {} # item -> value
+        self.inflight = {} # item -> future of the fetch in progress
+        self.requests = 0
+        self.hits = 0
+        self.coalesced = 0 # misses which waited for a fetch in progress
+        self.fetches = 0 # fetches from the origin
+        self.errors = 0 # failed fetches
+        self.latency = deque(maxlen=window) # latencies of the latest window requests in seconds
+
+    async def get(self, item):
+        """
+        Serves the request
+        item: requested item
+        Returns the value of the item
+        """
+        start = time.perf_counter()
+        t = self.requests if self.clock is None else self.clock()
+        self.requests += 1
+        hit = self.policy.access(item, t)
+        if self.prune_every is not None and self.requests % self.prune_every == 0:
+            self.prune()
+        try:
+            # A fetch in progress is at least as fresh as the stored value
+            if item in self.inflight:
+                self.coalesced += 1
+            elif hit and item in self.values:
+                self.hits += 1
+                return self.values[item]
+            else:
+                # The stored value is stale (e.g a freshness miss of LU), it isn't served again
+                self.values.pop(item, None)
+                self.fetch(item)
+            # Shielded so that a cancelled request doesn't cancel the fetch shared by the others
+            return await asyncio.shield(self.inflight[item])
+        finally:
+            self.latency.append(time.perf_counter() - start)
+
+    def fetch(self, item):
+        """
+        Starts fetching the item from the origin as a task of it's own, the requests of the item
+        arriving meanwhile wait for this task. It isn't owned by any request so it runs to
+        completion even if the request which started it is cancelled
+        item: item
+        Returns the task of the fetch
+        """
+        task = asyncio.ensure_future(self.origin(item))
+        self.inflight[item] = task
+        self.fetches += 1
+        task.add_done_callback(lambda task: self._fetched(item, task))
+        return task
+
+    def _fetched(self, item, task):
+        """
+        Stores the value of a finished fetch if the item is cached
+        item: item
+        task: task of the fetch
+        """
+        del self.inflight[item]
+        if task.cancelled():
+            return
+        # Retrieving the exception also marks it as retrieved when no request is waiting for it
+        if task.exception() is not None:
+            self.errors += 1
+        elif self.policy.cached(item):
+            self.values[item] = task.result()
+
+    def prune(self):
+        """
+        Drops the values of the items which are no longer cached
+        """
+        for item in [i for i in self.values if not self.policy.cached(i)]:
+            del self.values[item]
+
+    def percentiles(self, q=(50, 90, 99, 99.9)):
+        """
+        Returns dictionary of percentile -> latency in milliseconds of the latest window requests
+        q: percentiles
+        """
+        if len(self.latency) == 0:
+            return {p: 0.0 for p in q}
+        return dict(zip(q, (np.percentile(self.latency, q)*1e3).tolist()))
+
+    def summary(self):
+        """
+        Returns the statistics as a dictionary
+        """
+        stats = {'requests':self.requests, 'hits':self.hits, 'coalesced':self.coalesced,
+                 'origin_fetches':self.fetches, 'errors':self.errors,
+                 'hit_rate':self.hits/self.requests if self.requests > 0 else 0.0,
+                 'origin_saved':1 - self.fetches/self.requests if self.requests > 0 else 0.0}
+        stats.update({f"p{p:g}_ms": v for p, v in self.percentiles().items()})
+        return stats
+
+
+async def replay(service, requests, concurrency=100):
+    """
+    Replays the requests through the service with concurrent clients
+    service: CacheService
+    requests: array of requests
+    concurrency: No. of clients, each client sends it's next request after the previous one is answered.
+                 Failed requests are skipped, the failed fetches are counted in the errors of the service
+    Returns the summary of the service
+    """
+    requests = iter(np.asarray(requests).tolist())
+
+    async def client():
+        for req in requests:
+            try:
+                await service.get(req)
+            except Exception:
+                pass
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return service.summary()
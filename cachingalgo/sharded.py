@@ -0,0 +1,318 @@
+import hashlib
+import multiprocessing
+import pickle
+import random
+from multiprocessing import Pipe, Process
+import numpy as np
+from cachingalgo.simulate import Stats, adapt, simulate
+
+# Multiplier of the splitmix64 hash of the items
+GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+
+def item_hash(items):
+    """
+    Hashes the items with splitmix64
+    items: array of items
+    Returns array of 64 bit hashes
+    """
+    x = np.asarray(items).astype(np.uint64) + GOLDEN
+    x = (x ^ (x >> np.uint64(30)))*np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27)))*np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def node_hash(key):
+    """
+    Hashes the name of a virtual node
+    key: string
+    Returns 64 bit hash
+    """
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), 'little')
+
+
+# Consistent Hashing
+# Every node is placed at vnodes points of a ring of 64 bit hashes and an item is owned by
+# the node of the first point clockwise of it's hash. Adding or removing a node only moves
+# the items between it and it's neighbouring points.
+class HashRing:
+    def __init__(self, nodes=[], vnodes=100):
+        """
+        nodes: names of the nodes
+        vnodes: No. of virtual nodes (points on the ring) of each node
+        """
+        self.vnodes = vnodes
+        self.nodes = []
+        self.points = np.array([], dtype=np.uint64) # sorted points of the ring
+        self.owners = np.array([], dtype=int) # index in self.nodes of the owner of each point
+        for node in nodes:
+            self.add(node)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, node):
+        return node in self.nodes
+
+    def _build(self):
+        points = np.array([node_hash(f"{node}#{i}") for node in self.nodes for i in range(self.vnodes)],
+                          dtype=np.uint64)
+        owners = np.repeat(np.arange(len(self.nodes)), self.vnodes)
+        order = np.argsort(points, kind='stable')
+        self.points = points[order]
+        self.owners = owners[order]
+
+    def add(self, node):
+        """
+        Adds a node to the ring
+        node: name of the node
+        """
+        if node in self.nodes:
+            raise ValueError(f"Node {node} is already in the ring")
+        self.nodes.append(node)
+        self._build()
+
+    def remove(self, node):
+        """
+        Removes a node from the ring
+        node: name of the node
+        """
+        self.nodes.remove(node)
+        self._build()
+
+    def route(self, items):
+        """
+        Finds the nodes owning the items
+        items: array of items
+        Returns array of indices of the nodes in self.nodes
+        """
+        if len(self.nodes) == 0:
+            raise Exception("The ring has no nodes")
+        i = np.searchsorted(self.points, item_hash(items), side='right')
+        i[i == self.points.shape[0]] = 0
+        return self.owners[i]
+
+    def load(self, items):
+        """
+        Returns the no. of items (requests) owned by each node, in the order of self.nodes
+        items: array of items
+        """
+        return np.bincount(self.route(items), minlength=len(self.nodes))
+
+
+def imbalance(load):
+    """
+    Load imbalance of the shards, the max. load over the mean load (1 is perfectly balanced)
+    load: no. of requests of each shard
+    """
+    load = np.asarray(load, dtype=float)
+    return float(load.max()/load.mean()) if load.shape[0] > 0 and load.sum() > 0 else 1.0
+
+
+def _create(factory, node, seed):
+    """
+    Creates the algorithm of the node, the legacy algorithms use the global generators so they are seeded first
+    factory: function returning the algorithm of the node, called as factory(node)
+    node: name of the node
+    seed: seed of the node
+    Returns the Policy of the algorithm
+    """
+    np.random.seed(seed)
+    random.seed(seed)
+    return adapt(factory(node))
+
+
+def _serve(conn, factory, node, seed):
+    """
+    Worker process of a shard, replays the batches of requests received over the pipe
+    conn: end of the pipe of the shard
+    factory: function returning the algorithm of the node, called as factory(node)
+    node: name of the node
+    seed: seed of the node
+    """
+    error = None
+    try:
+        policy = _create(factory, node, seed)
+        stats = Stats()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    while True:
+        msg = conn.recv()
+        if msg is None:
+            break
+        if msg[0] == 'batch':
+            if error is None:
+                try:
+                    simulate(policy, msg[1], times=msg[2], stats=stats)
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+        elif msg[0] == 'stats':
+            conn.send(('error', error) if error is not None else ('stats', stats.summary()))
+    conn.close()
+
+
+def _check_picklable(factory):
+    """
+    Checks that the factory can be sent to the worker processes, which needs pickling unless they are forked
+    factory: function returning the algorithm of a node
+    """
+    method = multiprocessing.get_start_method(allow_none=True) or multiprocessing.get_all_start_methods()[0]
+    if method == 'fork':
+        return
+    try:
+        pickle.dumps(factory)
+    except Exception as e:
+        raise ValueError(f"The factory can't be sent to the worker processes started with '{method}', "
+                         f"use a module-level function or a functools.partial of one instead of a lambda "
+                         f"or a nested function, or processes=False ({type(e).__name__}: {e})") from None
+
+
+# Shard running in this process, it has the same interface as the worker process
+class _LocalShard:
+    def __init__(self, factory, node, seed):
+        self.policy = _create(factory, node, seed)
+        self.stats = Stats()
+
+    def send(self, reqs, times):
+        simulate(self.policy, reqs, times=times, stats=self.stats)
+
+    def summary(self):
+        return self.stats.summary()
+
+    def close(self):
+        pass
+
+
+# Shard running in a worker process, the batches are sent over a pipe without waiting for them
+class _ProcessShard:
+    def __init__(self, factory, node, seed):
+        self.conn, child = Pipe()
+        self.process = Process(target=_serve, args=(child, factory, node, seed), daemon=True)
+        self.process.start()
+        child.close()
+        self.node = node
+
+    def send(self, reqs, times):
+        self.conn.send(('batch', reqs, times))
+
+    def summary(self):
+        self.conn.send(('stats',))
+        kind, value = self.conn.recv()
+        if kind == 'error':
+            raise Exception(f"Shard {self.node} failed: {value}")
+        return value
+
+    def close(self):
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join()
+        self.conn.close()
+
+
+# Sharded Cache
+# The library is partitioned across the nodes of a consistent hash ring and every node runs it's
+# own instance of a caching algorithm (LRU, LFU, LU, WLFU, ...) in a worker process. The requests
+# are routed in batches, each shard receiving it's part of a batch over a pipe, so the shards serve
+# their requests in parallel. The arrival time of a request is it's index in the whole stream.
+class ShardedCache:
+    def __init__(self, factory, nodes, vnodes=100, batch_size=10_000, processes=True, seed=0):
+        """
+        factory: function returning a new instance of the algorithm of a node, called as factory(node). Items keep
+                 their ids so L is the library size. Unless the worker processes are forked it is pickled to them,
+                 so it should be a module-level function e.g def lru(node): return LRU(cache_size=100, L=L)
+                 or a functools.partial of one, not a lambda or a nested function
+        nodes: names of the nodes e.g ['edge-0', 'edge-1'] or no. of nodes
+        vnodes: No. of virtual nodes of each node
+        batch_size: No. of requests routed at once
+        processes: True - every shard runs in a worker process, False - all the shards run in this process
+        seed: seed from which the independent seeds of the nodes are generated
+        """
+        if isinstance(nodes, int):
+            nodes = list(range(nodes))
+        if processes:
+            _check_picklable(factory)
+        self.factory = factory
+        self.batch_size = batch_size
+        self.processes = processes
+        self.ring = HashRing(vnodes=vnodes)
+        self.seeds = np.random.SeedSequence(seed)
+        self.shards = {} # node -> shard
+        self.retired = {} # node -> statistics of the removed nodes
+        self.ithreq = 0 # no. of requests served so far
+        for node in nodes:
+            self.add_node(node)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_node(self, node):
+        """
+        Adds a node with an empty cache, the items it now owns are missed until they are cached again
+        node: name of the node
+        """
+        self.ring.add(node)
+        seed = int(self.seeds.spawn(1)[0].generate_state(1)[0])
+        shard = _ProcessShard if self.processes else _LocalShard
+        self.shards[node] = shard(self.factory, node, seed)
+
+    def remove_node(self, node):
+        """
+        Removes a node, the items it owned move to the other nodes. It's statistics are kept in self.retired
+        node: name of the node
+        """
+        if len(self.ring) == 1:
+            raise Exception("The last node can't be removed")
+        shard = self.shards.pop(node)
+        self.ring.remove(node)
+        try:
+            self.retired[node] = shard.summary()
+        finally:
+            shard.close()
+
+    def serve(self, requests, times=None):
+        """
+        Routes the requests to the shards in batches
+        requests: array of requests
+        times: arrival times of the requests, Default is the index of the request in the whole stream
+        """
+        requests = np.asarray(requests)
+        if times is None:
+            times = np.arange(self.ithreq, self.ithreq + requests.shape[0])
+        times = np.asarray(times)
+        for start in range(0, requests.shape[0], self.batch_size):
+            reqs = requests[start:start+self.batch_size]
+            t = times[start:start+self.batch_size]
+            owner = self.ring.route(reqs)
+            # Stable sort keeps the order of the requests of every shard
+            order = np.argsort(owner, kind='stable')
+            bounds = np.searchsorted(owner[order], np.arange(len(self.ring.nodes)+1))
+            for k, node in enumerate(self.ring.nodes):
+                part = order[bounds[k]:bounds[k+1]]
+                if part.shape[0] > 0:
+                    self.shards[node].send(reqs[part], t[part])
+        self.ithreq += requests.shape[0]
+
+    def stats(self):
+        """
+        Waits for the shards to serve the requests sent so far and collects their statistics
+        Returns dictionary with the statistics of every current node ('shards'), their aggregate ('total'),
+        their load imbalance ('imbalance') and the statistics of the removed nodes ('retired')
+        """
+        shards = {node: shard.summary() for node, shard in self.shards.items()}
+        total = {key: sum(s[key] for s in shards.values()) for key in
+                 ['requests', 'hits', 'misses', 'freshness_misses', 'cache_misses']}
+        total['hit_rate'] = total['hits']/total['requests'] if total['requests'] > 0 else 0.0
+        return {'shards': shards, 'total': total,
+                'imbalance': imbalance([s['requests'] for s in shards.values()]), 'retired': dict(self.retired)}
+
+    def close(self):
+        """
+        Stops the worker processes
+        """
+        for shard in self.shards.values():
+            shard.close()
+        self.shards = {}
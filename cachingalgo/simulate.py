@@ -0,0 +1,314 @@
+from abc import ABC, abstractmethod
+from itertools import repeat
+import numpy as np
+from cachingalgo.full_observation.single_cache import LFU, BucketLFU, WLFU, LFULite, CountSketch, LRU, OrderedLRU, LU
+from cachingalgo.full_observation.multiple_cache import fLRU
+from cachingalgo.full_observation.cost_min import CMSR, CMDR
+from cachingalgo.partial_observation.single_cache import CBMPS, CBSI
+from cachingalgo.tandem_model.dynamic import LU2
+
+# Miss types, same as the miss_type returned by LU
+FRESHNESS_MISS = 1 # the item is in the cache but it's copy is not fresh
+CACHE_MISS = 2 # the item is not in the cache
+
+# Common protocol of the algorithms used by the simulator. access(req, t) serves the request
+# arriving at time t and returns True if it is a hit. As in the notebooks, the hit is decided
+# by the cache the algorithm holds before the request, then the algorithm is updated.
+# After a miss, miss_type tells whether it is a freshness miss or a cache miss.
+class Policy(ABC):
+    def __init__(self, alg):
+        """
+        alg: Instance of the caching algorithm
+        """
+        self.alg = alg
+        self.ithreq = 0 # no. of requests served so far
+        self.miss_type = CACHE_MISS
+
+    @abstractmethod
+    def access(self, req, t):
+        """
+        Serves the request
+        req: Request
+        t: Arrival time of the request
+        Returns True if the request is a hit
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def cached(self, item):
+        """
+        Returns True if the item is in the cache
+        """
+        raise NotImplementedError
+
+
+# LFU and WLFU: the counters are updated and the cache is found again after every request
+class CounterPolicy(Policy):
+    def __init__(self, alg):
+        super().__init__(alg)
+        self.cache = np.array([], dtype=int)
+
+    def access(self, req, t):
+        hit = req in self.cache
+        self.alg.update(req)
+        self.cache = self.alg.currcache()
+        self.ithreq += 1
+        return hit
+
+    def cached(self, item):
+        return item in self.cache
+
+
+# Algorithms whose update maintains the cache and returns whether the request is a hit
+# i.e BucketLFU and OrderedLRU
+class HitPolicy(Policy):
+    def access(self, req, t):
+        self.ithreq += 1
+        return self.alg.update(req)
+
+    def cached(self, item):
+        return item in self.alg
+
+
+# LRU, LRU(m) and f-LRU which support the "in" keyword
+class MembershipPolicy(Policy):
+    def access(self, req, t):
+        hit = req in self.alg
+        self.alg.update(req)
+        self.ithreq += 1
+        return hit
+
+    def cached(self, item):
+        return item in self.alg
+
+
+# LFU-Lite needs the no. of requests processed so far
+class LitePolicy(CounterPolicy):
+    def access(self, req, t):
+        hit = req in self.cache
+        self.alg.update(req, self.ithreq)
+        self.cache = self.alg.currcache(self.ithreq)
+        self.ithreq += 1
+        return hit
+
+
+# Count-Sketch updates the counters and the cache in currcache
+class SketchPolicy(Policy):
+    def __init__(self, alg):
+        super().__init__(alg)
+        # HashCountSketch supports "in", CountSketch keeps the cache in a list
+        self.member = hasattr(type(alg), '__contains__')
+
+    def access(self, req, t):
+        if self.member:
+            hit = req in self.alg
+        else:
+            hit = req in self.alg.cache
+        self.alg.currcache(req)
+        self.ithreq += 1
+        return hit
+
+    def cached(self, item):
+        return item in self.alg if self.member else item in self.alg.cache
+
+
+# CB-MPS, CB-SI and CB-SILite: the cache is sampled before the parameters are updated
+class BanditPolicy(Policy):
+    def __init__(self, alg):
+        super().__init__(alg)
+        # The array variants support "in", the others keep the cache in a list
+        self.member = hasattr(type(alg), '__contains__')
+        self.lite = hasattr(alg, 'counterbank_update')
+
+    def access(self, req, t):
+        if self.member:
+            hit = bool(req in self.alg)
+        else:
+            hit = req in self.alg.cache
+        if self.lite:
+            self.alg.counterbank_update(req)
+        self.alg.currcache()
+        self.alg.update(req)
+        self.ithreq += 1
+        return hit
+
+    def cached(self, item):
+        return bool(item in self.alg) if self.member else item in self.alg.cache
+
+
+# LU and it's variants report the hit and the miss type themselves
+class LUPolicy(Policy):
+    def access(self, req, t):
+        served = self.alg.currcache(req, t, ithreq=self.ithreq)
+        self.ithreq += 1
+        self.miss_type = served['miss_type']
+        return served['cache_hit'] == 1
+
+    def cached(self, item):
+        return item in self.alg.fetchtime
+
+
+# LU2 and it's variants, the request is a hit if it is served by either of the caches.
+# A miss of an item present in one of the caches is a freshness miss.
+class TandemPolicy(Policy):
+    def __init__(self, alg):
+        super().__init__(alg)
+        self.hits = [0, 0] # hits of cache 1 and cache 2
+
+    def access(self, req, t):
+        present = req in self.alg.fetchtime1 or req in self.alg.fetchtime2
+        served = self.alg.currcache(req, t, ithreq=self.ithreq)
+        self.ithreq += 1
+        hit1, hit2 = served['cache_hit']
+        self.hits[0] += hit1
+        self.hits[1] += hit2
+        self.miss_type = FRESHNESS_MISS if present else CACHE_MISS
+        return hit1 == 1 or hit2 == 1
+
+    def cached(self, item):
+        return item in self.alg.fetchtime1 or item in self.alg.fetchtime2
+
+
+# CMDR updates the cache with the request
+class CostPolicy(Policy):
+    def __init__(self, alg):
+        super().__init__(alg)
+        self.cache = set(np.asarray(alg.C_hat).tolist())
+
+    def access(self, req, t):
+        hit = req in self.cache
+        cache = self.alg.currcache(req)
+        if self.alg.calpop:
+            self.cache = set(cache.tolist())
+        self.ithreq += 1
+        return hit
+
+    def cached(self, item):
+        return item in self.cache
+
+
+# Algorithms whose cache doesn't depend on the requests i.e CMSR
+class StaticPolicy(Policy):
+    def __init__(self, alg):
+        super().__init__(alg)
+        self.cache = set(np.asarray(alg.currcache()).tolist())
+
+    def access(self, req, t):
+        self.ithreq += 1
+        return req in self.cache
+
+    def cached(self, item):
+        return item in self.cache
+
+
+# Adapters of the algorithms, subclasses are placed before their parents
+ADAPTERS = [
+    (BucketLFU, HitPolicy),
+    (OrderedLRU, HitPolicy),
+    (LFU, CounterPolicy),
+    (WLFU, CounterPolicy),
+    (LFULite, LitePolicy),
+    (CountSketch, SketchPolicy),
+    (LRU, MembershipPolicy),
+    (fLRU, MembershipPolicy),
+    (LU2, TandemPolicy),
+    (LU, LUPolicy),
+    (CBMPS, BanditPolicy),
+    (CBSI, BanditPolicy),
+    (CMDR, CostPolicy),
+    (CMSR, StaticPolicy),
+]
+
+def adapt(alg):
+    """
+    Wraps the algorithm with it's adapter
+    alg: Instance of the caching algorithm or a Policy
+    Returns the Policy of the algorithm
+    """
+    if isinstance(alg, Policy):
+        return alg
+    for cls, adapter in ADAPTERS:
+        if isinstance(alg, cls):
+            return adapter(alg)
+    raise ValueError(f"No adapter for {type(alg).__name__}")
+
+
+# Statistics accumulated by the simulator
+class Stats:
+    def __init__(self):
+        self.requests = 0
+        self.hits = 0
+        self.freshness_misses = 0
+        self.cache_misses = 0
+        self.chunk_hits = [] # no. of hits in each chunk of requests
+
+    @property
+    def misses(self):
+        return self.freshness_misses + self.cache_misses
+
+    @property
+    def hit_rate(self):
+        return self.hits/self.requests if self.requests > 0 else 0.0
+
+    def summary(self):
+        """
+        Returns the statistics as a dictionary
+        """
+        return {'requests':self.requests, 'hits':self.hits, 'misses':self.misses,
+                'freshness_misses':self.freshness_misses, 'cache_misses':self.cache_misses,
+                'hit_rate':self.hit_rate}
+
+
+def slices(arr, size):
+    """
+    Returns generator of the consecutive slices (views) of the array
+    arr: array
+    size: length of the slices
+    """
+    return (arr[i:i+size] for i in range(0, arr.shape[0], size))
+
+
+def simulate(alg, requests, times=None, stats=None, chunk_size=100_000):
+    """
+    Replays the requests through the algorithm, one chunk at a time so that only a chunk of
+    the requests is converted to python integers at once
+    alg: Instance of the caching algorithm or a Policy
+    requests: array of requests or an iterable of arrays (chunks) of requests
+    times: arrival times in the same layout as requests, Default is the index of the request
+    stats: Stats to continue accumulating into, the policy keeps it's own state between calls
+    chunk_size: An array of requests (and times) is replayed in slices of chunk_size
+    Returns the Stats
+    """
+    policy = adapt(alg)
+    if stats is None:
+        stats = Stats()
+
+    if isinstance(requests, np.ndarray):
+        requests = slices(requests, chunk_size)
+        if times is not None:
+            times = slices(np.asarray(times), chunk_size)
+    if times is None:
+        times = repeat(None)
+
+    access = policy.access
+    for chunk, chunktimes in zip(requests, times):
+        chunk = np.asarray(chunk).tolist()
+        if chunktimes is None:
+            chunktimes = range(stats.requests, stats.requests + len(chunk))
+        else:
+            chunktimes = np.asarray(chunktimes).tolist()
+
+        hits = 0
+        for req, t in zip(chunk, chunktimes):
+            if access(req, t):
+                hits += 1
+            elif policy.miss_type == FRESHNESS_MISS:
+                stats.freshness_misses += 1
+            else:
+                stats.cache_misses += 1
+
+        stats.requests += len(chunk)
+        stats.hits += hits
+        stats.chunk_hits.append(hits)
+
+    return stats
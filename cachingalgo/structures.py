@@ -0,0 +1,512 @@
+from collections import OrderedDict
+
+# Frequency Buckets
+# Items are grouped into buckets by their integer count and the non-empty buckets are
+# kept in a doubly linked list ordered by count. Incrementing or decrementing an item
+# moves it to the neighbouring bucket in O(1) and the most frequent items are read
+# from the top of the list.
+class FrequencyBuckets:
+    def __init__(self):
+        self.count = {}     # item -> count
+        self.buckets = {}   # count -> OrderedDict of the items with that count (used as an ordered set)
+        self.up = {}        # count -> next higher non-empty count or None
+        self.down = {}      # count -> next lower non-empty count or None
+        self.low = None     # lowest non-empty count
+        self.high = None    # highest non-empty count
+
+    def __len__(self):
+        return len(self.count)
+
+    def __contains__(self, item):
+        return item in self.count
+
+    def _link(self, c, below, above):
+        """
+        Creates an empty bucket between two neighbouring non-empty buckets
+        c: count of the new bucket
+        below: next lower non-empty count or None
+        above: next higher non-empty count or None
+        """
+        self.buckets[c] = OrderedDict()
+        self.down[c] = below
+        self.up[c] = above
+        if below is None:
+            self.low = c
+        else:
+            self.up[below] = c
+        if above is None:
+            self.high = c
+        else:
+            self.down[above] = c
+
+    def _unlink(self, c):
+        """
+        Removes the empty bucket c from the linked list
+        c: count of the bucket
+        """
+        below = self.down.pop(c)
+        above = self.up.pop(c)
+        del self.buckets[c]
+        if below is None:
+            self.low = above
+        else:
+            self.up[below] = above
+        if above is None:
+            self.high = below
+        else:
+            self.down[above] = below
+
+    def add(self, item, count):
+        """
+        Adds a new item with the given count. The bucket is searched from the lowest count,
+        so it is O(1) when count is at most one more than the lowest count.
+        item: item to be added
+        count: count of the item (>= 1)
+        """
+        below = None
+        above = self.low
+        while above is not None and above < count:
+            below, above = above, self.up[above]
+        if above != count:
+            self._link(count, below, above)
+        self.buckets[count][item] = None
+        self.count[item] = count
+
+    def remove(self, item):
+        """
+        Removes the item
+        item: item to be removed
+        Returns the count of the removed item
+        """
+        c = self.count.pop(item)
+        bucket = self.buckets[c]
+        del bucket[item]
+        if not bucket:
+            self._unlink(c)
+        return c
+
+    def increment(self, item):
+        """
+        Increases the count of the item by one, new items start with count one
+        item: item to be incremented
+        """
+        c = self.count.get(item)
+        if c is None:
+            self.add(item, 1)
+            return
+        if self.up[c] != c+1:
+            self._link(c+1, c, self.up[c])
+        self.buckets[c+1][item] = None
+        self.count[item] = c+1
+        bucket = self.buckets[c]
+        del bucket[item]
+        if not bucket:
+            self._unlink(c)
+
+    def decrement(self, item):
+        """
+        Decreases the count of the item by one, the item is removed when it's count reaches zero
+        item: item to be decremented
+        """
+        c = self.count[item]
+        if c == 1:
+            self.remove(item)
+            return
+        if self.down[c] != c-1:
+            self._link(c-1, self.down[c], c)
+        self.buckets[c-1][item] = None
+        self.count[item] = c-1
+        bucket = self.buckets[c]
+        del bucket[item]
+        if not bucket:
+            self._unlink(c)
+
+    def lowest(self):
+        """
+        Returns the oldest item among the least frequent items and it's count
+        """
+        return next(iter(self.buckets[self.low])), self.low
+
+    def top(self, k):
+        """
+        Finds the k most frequent items in O(k)
+        k: no. of items
+        Returns list of items in decreasing order of count
+        """
+        items = []
+        c = self.high
+        while c is not None and len(items) < k:
+            for item in self.buckets[c]:
+                items.append(item)
+                if len(items) == k:
+                    break
+            c = self.down[c]
+        return items
+
+
+# Indexed Heap
+# Binary heap with the position of every item, so that the key of any item can be
+# changed or the item removed in O(log n) instead of rebuilding the heap.
+class IndexedHeap:
+    def __init__(self, reverse=False):
+        """
+        reverse: False - min-heap or True - max-heap
+        """
+        self.sign = -1 if reverse else 1
+        self.keys = []  # keys of the heap multiplied by self.sign
+        self.items = [] # items at the same positions as self.keys
+        self.pos = {}   # item -> position in the heap
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return item in self.pos
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def _swap(self, i, j):
+        self.keys[i], self.keys[j] = self.keys[j], self.keys[i]
+        self.items[i], self.items[j] = self.items[j], self.items[i]
+        self.pos[self.items[i]] = i
+        self.pos[self.items[j]] = j
+
+    def _siftup(self, i):
+        while i > 0:
+            parent = (i-1)//2
+            if self.keys[i] < self.keys[parent]:
+                self._swap(i, parent)
+                i = parent
+            else:
+                break
+
+    def _siftdown(self, i):
+        n = len(self.keys)
+        while True:
+            child = 2*i+1
+            if child >= n:
+                break
+            if child+1 < n and self.keys[child+1] < self.keys[child]:
+                child += 1
+            if self.keys[child] < self.keys[i]:
+                self._swap(i, child)
+                i = child
+            else:
+                break
+
+    def push(self, item, key):
+        """
+        Inserts the item or changes it's key if it is already present
+        item: item
+        key: priority of the item
+        """
+        if item in self.pos:
+            i = self.pos[item]
+            self.keys[i] = self.sign*key
+            self._siftup(i)
+            self._siftdown(self.pos[item])
+        else:
+            self.pos[item] = len(self.items)
+            self.keys.append(self.sign*key)
+            self.items.append(item)
+            self._siftup(len(self.items)-1)
+
+    def key(self, item):
+        """
+        Returns the key of the item
+        """
+        return self.sign*self.keys[self.pos[item]]
+
+    def peek(self):
+        """
+        Returns the item with the minimum (maximum if reverse) key and it's key
+        """
+        return self.items[0], self.sign*self.keys[0]
+
+    def remove(self, item):
+        """
+        Removes the item from the heap
+        item: item
+        Returns the key of the removed item
+        """
+        i = self.pos.pop(item)
+        key = self.sign*self.keys[i]
+        lastkey = self.keys.pop()
+        lastitem = self.items.pop()
+        if i < len(self.items):
+            self.keys[i] = lastkey
+            self.items[i] = lastitem
+            self.pos[lastitem] = i
+            self._siftup(i)
+            self._siftdown(self.pos[lastitem])
+        return key
+
+    def pop(self):
+        """
+        Removes the item with the minimum (maximum if reverse) key
+        Returns the removed item and it's key
+        """
+        item = self.items[0]
+        return item, self.remove(item)
+
+
+# Top-K
+# Maintains the k items with the largest scores by splitting the items into a min-heap
+# of the top k and a max-heap of the rest. Changing the score of an item costs O(log n)
+# and at most one item crosses between the two heaps.
+class TopK:
+    def __init__(self, k):
+        """
+        k: No. of items with the largest scores to be maintained
+        """
+        self.k = k
+        self.top = IndexedHeap()
+        self.rest = IndexedHeap(reverse=True)
+
+    def __len__(self):
+        return len(self.top) + len(self.rest)
+
+    def __contains__(self, item):
+        return item in self.top or item in self.rest
+
+    def _balance(self):
+        """
+        Restores the split after the score of a single item has changed
+        """
+        if len(self.top) < self.k and len(self.rest) > 0:
+            item, score = self.rest.pop()
+            self.top.push(item, score)
+        elif len(self.top) > 0 and len(self.rest) > 0 and self.rest.peek()[1] > self.top.peek()[1]:
+            item, score = self.rest.pop()
+            out, outscore = self.top.pop()
+            self.top.push(item, score)
+            self.rest.push(out, outscore)
+
+    def set(self, item, score):
+        """
+        Inserts the item or changes it's score
+        item: item
+        score: score of the item
+        """
+        if item in self.top:
+            self.top.push(item, score)
+        elif item in self.rest or len(self.top) >= self.k:
+            self.rest.push(item, score)
+        else:
+            self.top.push(item, score)
+        self._balance()
+
+    def remove(self, item):
+        """
+        Removes the item
+        item: item
+        """
+        if item in self.top:
+            self.top.remove(item)
+        else:
+            self.rest.remove(item)
+        self._balance()
+
+    def items(self):
+        """
+        Returns the k items with the largest scores in decreasing order of score
+        """
+        return sorted(self.top, key=self.top.key, reverse=True)
+
+    def members(self):
+        """
+        Returns the k items with the largest scores in no particular order, without sorting them
+        """
+        return list(self.top)
+
+
+# Segmented LRU
+# A list of LRU segments, each an ordered dict with the least recently used item at the start,
+# and one dict mapping every item to the segments holding it. Promotion between segments,
+# demotion or eviction of a tail and membership checks are all O(1).
+class SegmentedLRU:
+    def __init__(self, segments):
+        """
+        segments: list of lists of items for each segment, starting from the most recently used item
+        """
+        self.segments = [OrderedDict.fromkeys(reversed(s)) for s in segments]
+        self.where = {} # item -> set of segments holding the item
+        for k, segment in enumerate(self.segments):
+            for item in segment:
+                self.where.setdefault(item, set()).add(k)
+
+    def __contains__(self, item):
+        return item in self.where
+
+    def levels(self, item):
+        """
+        Returns the set of segments holding the item
+        """
+        return self.where.get(item, set())
+
+    def _forget(self, k, item):
+        levels = self.where[item]
+        levels.discard(k)
+        if not levels:
+            del self.where[item]
+
+    def touch(self, k, item):
+        """
+        Moves the item to the most recently used end of segment k
+        """
+        self.segments[k].move_to_end(item)
+
+    def push(self, k, item):
+        """
+        Inserts the item at the most recently used end of segment k
+        """
+        self.segments[k][item] = None
+        self.where.setdefault(item, set()).add(k)
+
+    def remove(self, k, item):
+        """
+        Removes the item from segment k
+        """
+        del self.segments[k][item]
+        self._forget(k, item)
+
+    def pop(self, k):
+        """
+        Removes the least recently used item of segment k
+        Returns the removed item
+        """
+        item, _ = self.segments[k].popitem(last=False)
+        self._forget(k, item)
+        return item
+
+    def items(self, k):
+        """
+        Returns an iterator over segment k from the most recently used item
+        """
+        return reversed(self.segments[k])
+
+
+# Kinetic Tournament
+# Maintains the minimum (or maximum) of up to n linear functions value(t) = a - b*t as t
+# increases. Every node of a tournament tree stores the winner of it's two children and
+# the time at which the winner is overtaken, so advancing the time repairs only the
+# nodes whose winner changed and inserting, changing or removing a function costs O(log n).
+class KineticTournament:
+    def __init__(self, n, t=0, reverse=False):
+        """
+        n: Maximum no. of items
+        t: starting time
+        reverse: False - minimum or True - maximum
+        """
+        self.sign = -1 if reverse else 1
+        self.size = 1
+        while self.size < max(n, 1):
+            self.size *= 2
+        inf = float('inf')
+        # Functions of the slots multiplied by self.sign, empty slots are a = inf, b = 0 so that they never win
+        self.a = [inf]*self.size
+        self.b = [0]*self.size
+        self.win = [0]*(2*self.size)    # winner slot of each node
+        self.fail = [inf]*(2*self.size) # earliest time at which a winner changes in the subtree
+        self.t = t
+        self.slot = {}                  # item -> slot
+        self.occupant = [None]*self.size # slot -> item
+        self.free = list(range(self.size-1, -1, -1)) # empty slots
+        for i in range(self.size):
+            self.win[self.size+i] = i
+        for node in range(self.size-1, 0, -1):
+            self.pull(node)
+
+    def __len__(self):
+        return len(self.slot)
+
+    def __contains__(self, item):
+        return item in self.slot
+
+    def value(self, i):
+        """
+        Returns the value of the function in slot i at the current time multiplied by self.sign
+        """
+        return self.a[i] - self.b[i]*self.t
+
+    def pull(self, node):
+        """
+        Calculates the winner of the node from it's children and the time at which it is overtaken
+        node: index of the internal node
+        """
+        l, r = self.win[2*node], self.win[2*node+1]
+        vl, vr = self.value(l), self.value(r)
+        # On a tie the steeper function wins as it stays smaller afterwards
+        if vl < vr or (vl == vr and self.b[l] >= self.b[r]):
+            w, o = l, r
+        else:
+            w, o = r, l
+        self.win[node] = w
+        if self.b[o] > self.b[w]:
+            cross = (self.a[o] - self.a[w])/(self.b[o] - self.b[w])
+        else:
+            cross = float('inf')
+        self.fail[node] = min(cross, self.fail[2*node], self.fail[2*node+1])
+
+    def repair(self, node):
+        """
+        Recalculates the winners of the nodes in the subtree whose certificates have failed
+        node: root of the subtree
+        """
+        if node >= self.size:
+            return
+        if self.fail[2*node] <= self.t:
+            self.repair(2*node)
+        if self.fail[2*node+1] <= self.t:
+            self.repair(2*node+1)
+        self.pull(node)
+
+    def advance(self, t):
+        """
+        Moves the current time forward to t
+        t: time (not smaller than the current time)
+        """
+        self.t = t
+        if self.fail[1] <= t:
+            self.repair(1)
+
+    def setslot(self, i, a, b):
+        """
+        Sets the function of slot i and updates the winners of it's ancestors
+        """
+        self.a[i] = a
+        self.b[i] = b
+        node = (self.size+i)//2
+        while node >= 1:
+            self.pull(node)
+            node //= 2
+
+    def set(self, item, a, b):
+        """
+        Inserts the item or changes it's function to a - b*t
+        item: item
+        a: value at t = 0
+        b: rate at which the value decreases
+        """
+        if item not in self.slot:
+            self.slot[item] = self.free.pop()
+            self.occupant[self.slot[item]] = item
+        self.setslot(self.slot[item], self.sign*a, self.sign*b)
+
+    def remove(self, item):
+        """
+        Removes the item
+        item: item
+        """
+        i = self.slot.pop(item)
+        self.occupant[i] = None
+        self.free.append(i)
+        self.setslot(i, float('inf'), 0)
+
+    def peek(self):
+        """
+        Returns the item with the minimum (maximum if reverse) value at the current time and it's value
+        """
+        w = self.win[1]
+        return self.occupant[w], self.sign*self.value(w)
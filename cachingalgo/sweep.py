@@ -0,0 +1,129 @@
+import csv
+import inspect
+import itertools
+import os
+import random
+import time
+from multiprocessing import Pool, shared_memory
+import numpy as np
+from cachingalgo.simulate import simulate, slices
+
+# Arrays shared with the worker processes, name -> (shared memory, array)
+_shared = {}
+
+def _attach(specs):
+    """
+    Attaches the worker process to the shared arrays
+    specs: dictionary of name -> (shared memory name, shape, dtype)
+    """
+    for key, (name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _shared[key] = (shm, np.ndarray(shape, dtype=dtype, buffer=shm.buf))
+
+
+def _run_cell(task):
+    """
+    Creates the algorithm of a cell of the grid and replays the shared requests through it
+    task: (factory, common parameters, parameters of the cell, seed, chunk size)
+    Returns the row of the cell
+    """
+    factory, params, cell, seed, chunk_size = task
+
+    # Legacy algorithms use the global generators, the others take a seed
+    np.random.seed(seed)
+    random.seed(seed)
+    kwargs = {**params, **cell}
+    try:
+        if 'seed' in inspect.signature(factory).parameters and 'seed' not in kwargs:
+            kwargs['seed'] = seed
+    except (TypeError, ValueError):
+        pass
+
+    # Bounded slices (views) of the shared arrays, so each worker converts only a chunk at a time
+    requests = slices(_shared['requests'][1], chunk_size)
+    times = slices(_shared['times'][1], chunk_size) if 'times' in _shared else None
+
+    start = time.perf_counter()
+    alg = factory(**kwargs)
+    stats = simulate(alg, requests, times=times)
+    elapsed = time.perf_counter() - start
+
+    row = dict(cell)
+    row.update(stats.summary())
+    row['seconds'] = elapsed
+    return row
+
+
+def grid_cells(grid):
+    """
+    Expands the parameter grid
+    grid: dictionary of parameter -> list of values
+    Returns list of dictionaries, one for each combination of the values
+    """
+    keys = list(grid.keys())
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def sweep(factory, grid, requests, times=None, params={}, processes=None, seed=0, chunk_size=100_000):
+    """
+    Runs the algorithm for every cell of the parameter grid in a process pool.
+    The requests are copied into shared memory once and every cell replays them.
+
+    factory: Algorithm class (or function returning an instance) e.g LFU, LRUm or CMDR
+    grid: dictionary of parameter -> list of values e.g {'cache_size': [10, 100]}
+    requests: array of requests
+    times: arrival times of the requests, Default is the index of the request
+    params: parameters common to all the cells
+    processes: No. of worker processes, Default is the no. of CPUs. 1 runs the cells in this process
+    seed: seed from which the independent seeds of the cells are generated
+    chunk_size: No. of the shared requests replayed at once by a worker
+    Returns list of rows (dictionaries) of the grid parameters and the statistics of each cell in the grid order
+    """
+    cells = grid_cells(grid)
+    seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(len(cells))]
+    tasks = [(factory, params, cell, s, chunk_size) for cell, s in zip(cells, seeds)]
+    if processes is None:
+        processes = os.cpu_count()
+    processes = min(processes, len(cells))
+
+    arrays = {'requests': np.ascontiguousarray(requests)}
+    if times is not None:
+        arrays['times'] = np.ascontiguousarray(times)
+
+    if processes <= 1:
+        _shared.update({k: (None, v) for k, v in arrays.items()})
+        try:
+            return [_run_cell(task) for task in tasks]
+        finally:
+            _shared.clear()
+
+    blocks = []
+    try:
+        specs = {}
+        for key, arr in arrays.items():
+            shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            blocks.append(shm)
+            np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+            specs[key] = (shm.name, arr.shape, arr.dtype.str)
+
+        with Pool(processes, initializer=_attach, initargs=(specs,)) as pool:
+            return pool.map(_run_cell, tasks, chunksize=1)
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+def write_table(rows, path):
+    """
+    Saves the rows returned by sweep as a csv file
+    rows: list of dictionaries
+    path: path of the csv file
+    """
+    fields = []
+    for row in rows:
+        fields.extend(k for k in row if k not in fields)
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
@@ -1,4 +1,6 @@
 from cachingalgo.full_observation.single_cache import LU
+from cachingalgo.structures import KineticTournament
+import numpy as np
 
 
 class LU2(LU):
@@ -117,7 +119,7 @@ class LU2(LU):
         # Check whether Cache1 is full or not
         if len(self.fetchtime1) < self.cache_size1:
             if self.method == 'lfulite' and req not in self.prob:
-                self.arr[req] = [ithreq+1, 1] # storing the items that are in start of the cache
+                self.arr.add(req, ithreq+1) # storing the items that are in start of the cache
             self.fetchtime1[req] = time + 1
         
         # Serving request in Cache1
@@ -131,7 +133,7 @@ class LU2(LU):
         elif len(self.fetchtime2) < self.cache_size2:
             c2pass = 1
             if self.method == 'lfulite' and req not in self.prob:
-                self.arr[req] = [ithreq+1, 1] # storing the items that are in start of the cache
+                self.arr.add(req, ithreq+1) # storing the items that are in start of the cache
             self.fetchtime2[req] = time + 1
         
         # Serving the request from the Cache2
@@ -152,3 +154,234 @@ class LU2(LU):
     
 
 
+# LU2 with the utilities of each cache maintained incrementally.
+# Utilities are linear in time, so the cached items are kept in kinetic tournaments, minimum
+# for cache 1 and minimum and maximum for cache 2, and the swap decisions cost O(log C1 + log C2).
+# As in KineticLU, the times in the trees are measured from self.origin which is moved every rebase_every
+# time units, method = 'lfu' uses the counters and method = 'lfulite' calculates the utilities as in LU2.
+class KineticLU2(LU2):
+    rebase_every = 2**20
+
+    def __init__(self, cache_sizes, **kwargs):
+        """
+        cache_sizes - array of cache size - length = 2
+        """
+        super().__init__(cache_sizes, **kwargs)
+        self.kinetic = self.method != 'lfulite'
+        self.tree1 = KineticTournament(self.cache_size1)
+        self.tree2 = KineticTournament(self.cache_size2)
+        self.tree2max = KineticTournament(self.cache_size2, reverse=True)
+        self.origin = 0 # time from which the utilities in the trees are measured
+
+    def weight(self, item):
+        """
+        Returns the popularity of the item used in the utility
+        """
+        if self.calpop and self.method == 'lfu':
+            return self.arr[item]
+        return self.prob[item]
+
+    def refresh(self, item):
+        """
+        Updates the utility of the cached item in the trees
+        """
+        w = self.weight(item)
+        if item in self.fetchtime1:
+            self.tree1.set(item, w*(self.fetchtime1[item] + self.F[item] - self.origin), w)
+        else:
+            a = w*(self.fetchtime2[item] + self.F[item] - self.origin)
+            self.tree2.set(item, a, w)
+            self.tree2max.set(item, a, w)
+
+    def elapsed(self, time):
+        """
+        Returns the time since the origin of the trees, the trees are rebuilt from the current time
+        once it exceeds rebase_every
+        time: current time
+        """
+        if time - self.origin >= self.rebase_every:
+            self.origin = time
+            self.tree1 = KineticTournament(self.cache_size1)
+            self.tree2 = KineticTournament(self.cache_size2)
+            self.tree2max = KineticTournament(self.cache_size2, reverse=True)
+            for item in [*self.fetchtime1, *self.fetchtime2]:
+                self.refresh(item)
+        return time - self.origin
+
+    def place(self, cache, item, fetchtime):
+        """
+        Stores the item in the cache with it's fetch time
+        cache: 1 or 2
+        item: library item
+        fetchtime: time at which item is fetched
+        """
+        if cache == 1:
+            self.fetchtime1[item] = fetchtime
+        else:
+            self.fetchtime2[item] = fetchtime
+        if self.kinetic:
+            self.refresh(item)
+
+    def evict(self, cache, item):
+        """
+        Removes the item from the cache
+        cache: 1 or 2
+        item: library item
+        Returns the fetch time of the item
+        """
+        if cache == 1:
+            fetchtime = self.fetchtime1.pop(item)
+            if self.kinetic:
+                self.tree1.remove(item)
+        else:
+            fetchtime = self.fetchtime2.pop(item)
+            if self.kinetic:
+                self.tree2.remove(item)
+                self.tree2max.remove(item)
+        return fetchtime
+
+    def cache1_update(self, req, time):
+        """
+        Updates the cache 1
+        req: Request
+        time: Request arrival time
+        """
+        if not self.kinetic:
+            return super().cache1_update(req, time)
+
+        if len(self.fetchtime2) > 0:
+            self.tree2max.advance(self.elapsed(time+1))
+            maxindk, vk = self.tree2max.peek() # Gives the key with maximum value
+
+            if self.weight(req)*self.F[req] < vk:
+                self.evict(1, req)
+                self.place(1, maxindk, self.evict(2, maxindk))
+                self.place(2, req, time + 1)
+            else:
+                self.place(1, req, time + 1)
+        else:
+            self.place(1, req, time + 1)
+
+    def cache2_update(self, req, time):
+        """
+        Updates the cache 2
+        req: Request
+        time: Request arrival time
+        """
+        if not self.kinetic:
+            return super().cache2_update(req, time)
+
+        self.tree1.advance(self.elapsed(time+1))
+        minindj, vj = self.tree1.peek() # Gives the key with minimum value
+        if self.weight(req)*self.F[req] > vj:
+            self.evict(2, req)
+            self.place(2, minindj, self.evict(1, minindj))
+            self.place(1, req, time + 1)
+        else:
+            self.place(2, req, time + 1)
+
+    def cache12_update(self, req, time):
+        """
+        Updates the cache 1 and 2 simultaneously
+        req: Request
+        time: Request arrival time
+        """
+        if not self.kinetic:
+            return super().cache12_update(req, time)
+
+        self.tree1.advance(self.elapsed(time+1))
+        self.tree2.advance(self.elapsed(time+1))
+        minindj, vj = self.tree1.peek() # Gives the key with minimum value of cache 1
+        minindk, vk = self.tree2.peek() # Gives the key with minimum value of cache 2
+        u = self.weight(req)*self.F[req]
+
+        if u > vj:
+            if vj >= vk:
+                self.evict(2, minindk)
+                self.place(2, minindj, self.evict(1, minindj))
+                self.place(1, req, time + 1)
+            elif vk > u:
+                self.evict(1, minindj)
+                self.place(1, minindk, self.evict(2, minindk))
+                self.place(2, req, time + 1)
+            else:
+                self.evict(1, minindj)
+                self.place(1, req, time + 1)
+        elif u >= vk:
+            self.evict(2, minindk)
+            self.place(2, req, time + 1)
+
+    def popularity_update(self, req, ithreq):
+        """
+        Calculates and updates the popularity of the items used in the algorithm
+        req: Request
+        ithreq: no. of request algorithm processed so far
+        """
+        if self.method != 'lfu':
+            return super().popularity_update(req, ithreq)
+        # Only the counter of the request changes, normalisation is done in popularity()
+        self.update(req, ithreq = ithreq)
+        if req in self.fetchtime1 or req in self.fetchtime2:
+            self.refresh(req)
+
+    def currcache(self, req, time, ithreq = None):
+        """
+        Calculates the current cache
+        req: Request
+        time: Request arrival time
+        ithreq: no. of request algorithm processed so far
+        Returns: cache, cache_hit and miss_type
+        """
+
+        hit1 = 0 # hit '1' or miss '0' for cache 1
+        hit2 = 0 # hit '1' or miss '0' for cache 2
+        c2pass = 0 # Whether the request goes to cache 2
+
+        if req >= self.L:
+            raise Exception("The Requested item is not in the library")
+
+        # Updates the popularity
+        if self.calpop:
+            self.popularity_update(req, ithreq)
+
+        # Check whether Cache1 is full or not
+        if len(self.fetchtime1) < self.cache_size1:
+            if self.method == 'lfulite' and req not in self.prob:
+                self.arr.add(req, ithreq+1) # storing the items that are in start of the cache
+            self.place(1, req, time + 1)
+
+        # Serving request in Cache1
+        elif req in self.fetchtime1:
+            if self.fetchtime1[req] + self.F[req] >= (time + 1):
+                hit1 = 1
+            else:
+                self.cache1_update(req, time)
+
+        # Check whether Cache2 is full or not
+        elif len(self.fetchtime2) < self.cache_size2:
+            c2pass = 1
+            if self.method == 'lfulite' and req not in self.prob:
+                self.arr.add(req, ithreq+1) # storing the items that are in start of the cache
+            self.place(2, req, time + 1)
+
+        # Serving the request from the Cache2
+        elif req in self.fetchtime2:
+            c2pass = 1
+            if self.fetchtime2[req] + self.F[req] >= (time+1):
+                hit2 = 1
+            else:
+                self.cache2_update(req, time)
+
+        # Serving the request from the library
+        else:
+            c2pass = 1
+            if self.method == 'lfu' or ((self.method == 'lfulite')^(req not in self.prob)):
+                self.cache12_update(req, time)
+
+        return {'cache':[[*self.fetchtime1.keys()],[*self.fetchtime2.keys()]], 'cache_hit':[hit1,hit2], 'c2pass':c2pass}
+
+    def popularity(self):
+        "Return the popularity of the items used in the algorithm"
+        if self.calpop and self.method == 'lfu':
+            self.prob = self.arr/np.sum(self.arr)
+        return self.prob